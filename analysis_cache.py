@@ -0,0 +1,84 @@
+"""
+Bounded cache of per-post content analysis, keyed by a hash of the content
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+def content_digest(content: str) -> bytes:
+    """Hash identifying a post's content"""
+    return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+class AnalysisCache:
+    """LRU cache of analysis dicts for content seen before
+
+    Forum pages repeat text (quoted replies, stickies shown on every page,
+    cross-posts), and a post's analysis only depends on its content and the
+    content patterns. Entries belong to one pattern fingerprint: a lookup
+    with a different fingerprint drops every entry first.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.fingerprint: Optional[str] = None
+        self.entries: 'OrderedDict[bytes, Dict[str, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, content: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """A copy of the stored analysis of content, or None"""
+        if not self.enabled:
+            return None
+        if fingerprint != self.fingerprint:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.fingerprint = fingerprint
+
+        key = content_digest(content)
+        analysis = self.entries.get(key)
+        if analysis is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return _copy(analysis)
+
+    def put(self, content: str, fingerprint: str, analysis: Dict[str, Any]):
+        """Store the analysis of content, evicting the least recently used entry when full"""
+        if not self.enabled or fingerprint != self.fingerprint:
+            return
+        self.entries[content_digest(content)] = _copy(analysis)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.fingerprint = None
+
+    def counts(self) -> Tuple[int, int]:
+        return self.hits, self.misses
+
+    def add_counts(self, hits: int, misses: int):
+        """Add lookups made by another cache, such as a worker process's"""
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'invalidations': self.invalidations
+        }
+
+def _copy(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an analysis dict whose lists are not shared with the cache"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in analysis.items()}
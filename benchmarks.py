@@ -0,0 +1,528 @@
+"""
+Performance benchmarks for the Imamother scraper pipeline
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Callable
+
+from bs4 import BeautifulSoup
+
+from config import ScrapingConfig
+from data_extractor import DataExtractor, StreamingDataExtractor
+from tokenization import normalize, public_record
+from keyword_engine import KeywordEngine
+from sentiment import SentimentScorer
+from patterns import PatternRegistry
+from taxonomy import DEFAULT_TAXONOMY
+from storage import (
+    COMPRESSION_EXTENSIONS, CsvPostWriter, JsonLinesSink, compressed_path, load_posts,
+    open_data, read_csv_posts, zstandard
+)
+from utils import categorize_business_opportunity
+
+SAMPLE_WORDS = [
+    'pregnancy', 'doctor', 'baby', 'sleep', 'worried', 'advice', 'book', 'help',
+    'recommend', 'husband', 'shabbos', 'school', 'camp', 'tired', 'grateful',
+    'specialist', 'website', 'product', 'experience', 'hopeful', 'first', 'trimester',
+    'nausea', 'morning', 'week', 'family', 'kids', 'question', 'anyone', 'suggestions'
+]
+
+BENCHMARKS = ['parsers', 'partial', 'templates', 'fallback', 'patterns', 'matcher', 'mentions', 'cache', 'keywords', 'taxonomy', 'sentiment', 'compression', 'streaming', 'batch']
+
+def build_sample_page(page_number: int, posts_per_page: int = 100, seed: int = 0) -> bytes:
+    """Build a synthetic forum page shaped like an archived Imamother listing"""
+    rng = random.Random(seed * 1000 + page_number)
+    posts = []
+    for i in range(posts_per_page):
+        post_id = page_number * posts_per_page + i
+        body = ' '.join(rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(20, 120)))
+        if rng.random() < 0.3:
+            body += '?'
+        quote = ''
+        if rng.random() < 0.3:
+            quote = f'<blockquote class="quote">Quoting: {" ".join(rng.sample(SAMPLE_WORDS, 8))}</blockquote>'
+        posts.append(f"""
+        <div class="post" id="post-{post_id}">
+          <div class="post-header">
+            <span class="username">member{rng.randint(1, 500)}</span>
+            <time datetime="2024-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00">Jan</time>
+            <h3 class="title">Thread about {rng.choice(SAMPLE_WORDS)} {post_id}</h3>
+          </div>
+          <div class="post-content">{quote}<p>{body}</p>
+            <p>See <a href="https://www.amazon.com/dp/{post_id}">this {rng.choice(SAMPLE_WORDS)}</a></p>
+            <div class="signature">-- sent from my phone</div>
+          </div>
+          <div class="post-footer">
+            <span class="replies">{rng.randint(0, 40)} replies</span>
+            <span class="views">{rng.randint(10, 4000)} views</span>
+            <span class="tag">{rng.choice(SAMPLE_WORDS)}</span>
+          </div>
+        </div>""")
+    sidebar = ''.join(f'<li><a href="/forum/{w}">{w}</a></li>' for w in SAMPLE_WORDS)
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Imamother - page {page_number}</title>
+<script>var tracking = {{"page": {page_number}}};</script>
+<style>.post {{ margin: 0 }}</style></head>
+<body><div id="header"><ul class="nav">{sidebar}</ul></div>
+<div id="sidebar"><ul>{sidebar}</ul><div class="ad">Advertisement</div></div>
+<div id="main">{''.join(posts)}</div>
+<div id="footer">Copyright Imamother</div></body></html>"""
+    return html.encode('utf-8')
+
+def load_page_corpus(corpus_dir: str = None, pages: int = 20) -> List[bytes]:
+    """Load saved HTML pages from a directory, or build a synthetic corpus"""
+    if corpus_dir:
+        corpus = []
+        for filename in sorted(os.listdir(corpus_dir)):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(corpus_dir, filename), 'rb') as f:
+                    corpus.append(f.read())
+        return corpus
+    return [build_sample_page(page) for page in range(1, pages + 1)]
+
+def time_call(func: Callable, repeat: int = 3) -> float:
+    """Return the best wall-clock time of several calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_parsers(corpus: List[bytes], repeat: int = 3) -> Dict[str, float]:
+    """Report pages/sec of extract_page_data for each parser backend"""
+    results = {}
+    for backend in ['lxml', 'html.parser']:
+        config = ScrapingConfig()
+        config.PARSER_BACKEND = backend
+        extractor = DataExtractor(config)
+        if extractor.parser_backend != backend:
+            print(f"  {backend:<12} unavailable, skipped")
+            continue
+
+        def run():
+            for page in corpus:
+                extractor.extract_page_data(page, 'general_discussion')
+
+        elapsed = time_call(run, repeat)
+        results[backend] = len(corpus) / elapsed
+        print(f"  {backend:<12} {results[backend]:8.1f} pages/sec")
+    return results
+
+def bench_partial_parse(corpus: List[bytes], repeat: int = 3) -> Dict[str, tuple]:
+    """Report pages/sec and peak memory of full vs partial (learned selector) parsing"""
+    results = {}
+    for mode in ['full', 'partial']:
+        config = ScrapingConfig()
+        config.PARTIAL_PARSE = mode == 'partial'
+        extractor = DataExtractor(config)
+        extractor.extract_page_data(corpus[0], 'general_discussion')  # learn the selector
+
+        def run():
+            for page in corpus:
+                extractor.extract_page_data(page, 'general_discussion')
+
+        elapsed = time_call(run, repeat)
+        tracemalloc.start()
+        extractor.extract_page_data(corpus[0], 'general_discussion')
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[mode] = (len(corpus) / elapsed, peak)
+        print(f"  {mode:<8} {results[mode][0]:8.1f} pages/sec  {peak / 1024 / 1024:6.1f} MB peak per page")
+    return results
+
+def bench_streaming(posts_per_page: int = 2000, chunk_size: int = 65536, repeat: int = 3) -> Dict[str, tuple]:
+    """Report time and peak memory of DOM vs streaming extraction on one long page"""
+    page = build_sample_page(1, posts_per_page)
+    chunks = [page[i:i + chunk_size] for i in range(0, len(page), chunk_size)]
+    learner = DataExtractor()
+    learner.extract_page_data(build_sample_page(2, 5), 'general_discussion')  # learn the selector
+    
+    dom = DataExtractor()
+    streaming = StreamingDataExtractor()
+    for extractor in (dom, streaming):
+        extractor.selector_plan = {k: dict(v) for k, v in learner.selector_plan.items()}
+    
+    # Records are counted and dropped, as a streaming sink would
+    runs = {
+        'dom': lambda: sum(1 for _ in dom.extract_page_data(page, 'general_discussion')),
+        'streaming': lambda: sum(1 for _ in streaming.iter_page_data(chunks, 'general_discussion'))
+    }
+    results = {}
+    print(f"  page of {posts_per_page} posts, {len(page) / 1024 / 1024:.1f} MB")
+    for name, run in runs.items():
+        elapsed = time_call(run, repeat)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = (elapsed, peak)
+        print(f"  {name:<10} {elapsed:8.2f} s  {peak / 1024 / 1024:6.1f} MB peak")
+    return results
+
+def bench_batch(corpus: List[bytes], workers: int = None, repeat: int = 3) -> Dict[str, float]:
+    """Report pages/sec of sequential extract_page_data vs extract_many on a process pool"""
+    pages = [(page, 'general_discussion') for page in corpus]
+    workers = workers or os.cpu_count() or 1
+    runs = {
+        'sequential': lambda: [DataExtractor().extract_page_data(html, section) for html, section in pages],
+        f'{workers} workers': lambda: list(DataExtractor().extract_many(pages, workers=workers))
+    }
+    results = {}
+    for name, run in runs.items():
+        elapsed = time_call(run, repeat)
+        results[name] = len(corpus) / elapsed
+        print(f"  {name:<12} {results[name]:8.1f} pages/sec")
+    return results
+
+def bench_templates(corpus: List[bytes], repeat: int = 3) -> Dict[str, float]:
+    """Report pages/sec with field selector cascades vs learned field paths"""
+    results = {}
+    for mode in ['cascade', 'templates']:
+        config = ScrapingConfig()
+        config.FIELD_TEMPLATES = mode == 'templates'
+        extractor = DataExtractor(config)
+        for page in corpus[:config.TEMPLATE_LEARNING_PAGES]:
+            extractor.extract_page_data(page, 'general_discussion')  # learn the paths
+        
+        def run():
+            for page in corpus:
+                extractor.extract_page_data(page, 'general_discussion')
+        
+        elapsed = time_call(run, repeat)
+        results[mode] = len(corpus) / elapsed
+        print(f"  {mode:<10} {results[mode]:8.1f} pages/sec")
+    return results
+
+def build_nested_page(depth: int = 800) -> bytes:
+    """Build a deeply nested page with no standard post classes"""
+    opening = ''.join(
+        f'<div class="wrap"><span class="user">member{i}</span> some words from the layout {i} '
+        for i in range(depth)
+    )
+    return f"<html><body>{opening}{'</div>' * depth}</body></html>".encode('utf-8')
+
+def bench_fallback(depth: int = 800, repeat: int = 3) -> float:
+    """Report the time of the post-detection fallback on a deeply nested page"""
+    extractor = DataExtractor()
+    soup = BeautifulSoup(build_nested_page(depth), extractor.parser_backend)
+    elapsed = time_call(lambda: extractor._find_posts_fallback(soup), repeat)
+    print(f"  depth {depth:<6} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+def build_sample_posts(count: int = 2000, seed: int = 0) -> List[str]:
+    """Build synthetic post bodies for content analysis benchmarks"""
+    rng = random.Random(seed)
+    phrases = ['how to', 'what is', 'i suggest', 'in my experience', 'you should', 'try this']
+    posts = []
+    for _ in range(count):
+        words = [rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(20, 150))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+        posts.append(' '.join(words).capitalize() + rng.choice(['.', '?', '!']))
+    return posts
+
+def analyze_with_raw_patterns(patterns: Dict[str, List[str]], content: str) -> Dict:
+    """Content analysis as done before the pattern registry, for comparison"""
+    content_lower = content.lower()
+    mentions = set()
+    for pattern in patterns['resource_mentions']:
+        for match in re.finditer(rf'\b\w*{pattern}\w*\b', content_lower, re.IGNORECASE):
+            mentions.add(match.group())
+    return {
+        'is_question': any(re.search(p, content_lower, re.IGNORECASE) for p in patterns['question_indicators']),
+        'is_answer': any(re.search(p, content_lower, re.IGNORECASE) for p in patterns['answer_indicators']),
+        'sentiment_indicators': [p for p in patterns['emotional_indicators']
+                                 if re.search(p, content_lower, re.IGNORECASE)],
+        'resource_mentions': list(mentions)
+    }
+
+def analyze_per_category(patterns: PatternRegistry, content: str) -> tuple:
+    """Content analysis with one pass per category over the compiled registry, as before the single-pass matcher"""
+    return (any(compiled.search(content) for _, compiled in patterns.group('question_indicators')),
+            any(compiled.search(content) for _, compiled in patterns.group('answer_indicators')),
+            [pattern for pattern, compiled in patterns.group('emotional_indicators') if compiled.search(content)],
+            sorted(patterns.matcher.mentions(content, 'resource_mentions')))
+
+def bench_patterns(posts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Report per-post analysis time with raw pattern strings vs the compiled registry"""
+    extractor = DataExtractor()
+    patterns = extractor.patterns.raw
+
+    def compiled():
+        for content in posts:
+            analyze_per_category(extractor.patterns, content.lower())
+
+    results = {
+        'raw patterns': time_call(lambda: [analyze_with_raw_patterns(patterns, c) for c in posts], repeat),
+        'compiled registry': time_call(compiled, repeat)
+    }
+    for name, elapsed in results.items():
+        print(f"  {name:<18} {elapsed / len(posts) * 1e6:8.1f} us/post")
+    return results
+
+def bench_matcher(posts: List[str], repeat: int = 1) -> Dict[str, float]:
+    """Report analysis time with one pass per category vs the single-pass matcher"""
+    extractor = DataExtractor()
+    contents = [content.lower() for content in posts]
+    
+    def per_category():
+        return [analyze_per_category(extractor.patterns, content) for content in contents]
+    
+    def single_pass():
+        results = []
+        emotions = extractor.patterns['emotional_indicators']
+        for content in contents:
+            hits = extractor.patterns.matcher.scan(content)
+            found = hits.matched('emotional_indicators')
+            results.append((bool(hits.matched('question_indicators')),
+                            bool(hits.matched('answer_indicators')),
+                            [pattern for pattern in emotions if pattern in found],
+                            sorted(hits.mentions('resource_mentions'))))
+        return results
+    
+    mismatches = sum(1 for a, b in zip(per_category(), single_pass()) if a != b)
+    results = {
+        'per category': time_call(per_category, repeat),
+        'single pass': time_call(single_pass, repeat)
+    }
+    print(f"  {len(posts)} posts, {mismatches} with different hits")
+    for name, elapsed in results.items():
+        print(f"  {name:<14} {elapsed:8.2f} s  {elapsed / len(posts) * 1e6:8.1f} us/post")
+    return results
+
+def build_worst_case_posts(length: int = 200000) -> Dict[str, str]:
+    """Long posts without spaces, where every position is inside one huge word"""
+    rng = random.Random(0)
+    url = 'https://www.example.com/redirect?u=' + ''.join(
+        rng.choice('abcdefghijklmnopqrstuvwxyz0123456789_') for _ in range(length))
+    transliteration = ''.join(rng.choice(['bsiyata', 'dishmaya', 'boruch', 'hashem', 'mamash', 'bli', 'neder'])
+                              for _ in range(length // 7))
+    near_miss = 'boo' * (length // 3)  # every position almost starts a stem
+    return {'pasted url': url, 'transliteration': transliteration, 'near-miss stems': near_miss}
+
+def bench_mentions(repeat: int = 3) -> Dict[str, tuple]:
+    """Report resource mention extraction time per stem regex vs tokens, on worst-case posts"""
+    extractor = DataExtractor()
+    stems = extractor.patterns['resource_mentions']
+    inputs = build_worst_case_posts()
+    inputs['typical posts'] = ' '.join(build_sample_posts(200)).lower()
+    
+    results = {}
+    for name, content in inputs.items():
+        regex = time_call(lambda: {m.group() for stem in stems
+                                   for m in re.finditer(rf'\b\w*{stem}\w*\b', content, re.IGNORECASE)}, repeat)
+        tokens = time_call(lambda: extractor.patterns.matcher.mentions(content, 'resource_mentions'), repeat)
+        results[name] = (regex, tokens)
+        print(f"  {name:<18} {len(content) / 1024:6.0f} KB  regex {regex * 1000:8.2f} ms  tokens {tokens * 1000:8.2f} ms")
+    return results
+
+def bench_analysis_cache(posts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Report per-post analysis time with and without the analysis cache, when half the posts repeat"""
+    # Every other post reappears later, as quoted replies and stickies do
+    stream = posts + posts[::2]
+    results = {}
+    for name, size in (('no cache', 0), ('cache', ScrapingConfig.ANALYSIS_CACHE_SIZE)):
+        config = ScrapingConfig()
+        config.ANALYSIS_CACHE_SIZE = size
+        extractor = DataExtractor(config)
+
+        def run():
+            extractor.analysis_cache.clear()
+            for content in stream:
+                extractor._cached_analysis({'content': content})
+
+        results[name] = time_call(run, repeat) / len(stream)
+        cache_stats = extractor.analysis_cache.stats()
+        print(f"  {name:<10} {results[name] * 1e6:8.1f} us/post  hit rate {cache_stats['hit_rate']:.0%}")
+    return results
+
+def bench_keywords(posts: List[str]) -> Dict[str, float]:
+    """Report TF-IDF keyword engine build and query time over a corpus of posts"""
+    words = [normalize(post).words for post in posts]
+    engine = KeywordEngine()
+    
+    start = time.perf_counter()
+    for tokens in words:
+        engine.add(tokens)
+    engine.finalize()
+    results = {'build': time.perf_counter() - start}
+    
+    start = time.perf_counter()
+    for row in range(len(words)):
+        engine.top_terms(row)
+    results['per post'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    engine.top_terms_by([str(row % 12) for row in range(len(words))])
+    results['per group'] = time.perf_counter() - start
+    
+    print(f"  {len(words)} posts, {len(engine.vocabulary)} terms, {len(engine.indices)} stored entries")
+    for name, elapsed in results.items():
+        print(f"  {name:<10} {elapsed:8.2f} s")
+    return results
+
+def bench_taxonomy(posts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Report per-post opportunity categorization time: one `in` test per keyword vs the compiled taxonomy"""
+    categories = {name: terms['keywords'] for name, terms in DEFAULT_TAXONOMY['categories'].items()}
+    records = [{'content': post, 'title': 'Thread about sleep', 'section': 'general_discussion'} for post in posts]
+    
+    def per_keyword(record):
+        text = f"{record['content'].lower()} {record['title'].lower()}"
+        scores = {name: sum(1 for keyword in keywords if keyword in text) for name, keywords in categories.items()}
+        return max(scores, key=scores.get)
+    
+    # Records keep their normalized text, as extracted posts do
+    for record in records:
+        categorize_business_opportunity(record)
+    
+    results = {
+        'per keyword': time_call(lambda: [per_keyword(record) for record in records], repeat) / len(records),
+        'taxonomy': time_call(lambda: [categorize_business_opportunity(record) for record in records], repeat) / len(records)
+    }
+    for name, elapsed in results.items():
+        print(f"  {name:<12} {elapsed * 1e6:8.1f} us/post")
+    return results
+
+def bench_sentiment(posts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Report per-post sentiment scoring time over one batch, next to the rest of the analysis"""
+    words = [normalize(post).words for post in posts]
+    scorer = SentimentScorer()
+    extractor = DataExtractor()
+    extractor.analysis_cache.max_entries = 0
+    
+    results = {
+        'analysis': time_call(lambda: [extractor._analyze_content(post) for post in posts], repeat) / len(posts),
+        'sentiment': time_call(lambda: scorer.score(words), repeat) / len(posts)
+    }
+    for name, elapsed in results.items():
+        print(f"  {name:<10} {elapsed * 1e6:8.1f} us/post")
+    return results
+
+def bench_compression(corpus: List[bytes], repeat: int = 3) -> Dict[str, tuple]:
+    """Report file size, write time and read time of each output format under each codec"""
+    extractor = DataExtractor()
+    data = {'general_discussion': [public_record(post) for html in corpus
+                                   for post in extractor.extract_page_data(html, 'general_discussion')]}
+    posts = data['general_discussion']
+    
+    def write_json(path):
+        with open_data(path, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    
+    def write_jsonl(path):
+        with JsonLinesSink(path) as sink:
+            sink.write(posts)
+    
+    def write_csv(path):
+        with CsvPostWriter(path) as writer:
+            writer.write(posts)
+    
+    formats = {
+        'json': (write_json, load_posts),
+        'jsonl': (write_jsonl, load_posts),
+        'csv': (write_csv, read_csv_posts)
+    }
+    codecs = [None] + [codec for codec in COMPRESSION_EXTENSIONS if codec != 'zstd' or zstandard is not None]
+    
+    print(f"  {len(posts)} posts")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for format_type, (write, read) in formats.items():
+            plain_size = None
+            for codec in codecs:
+                path = compressed_path(os.path.join(directory, f"posts.{format_type}"), codec)
+                
+                def write_new():
+                    # The JSON Lines sink appends, so every run starts from no file
+                    if os.path.exists(path):
+                        os.remove(path)
+                    write(path)
+                
+                write_time = time_call(write_new, repeat)
+                read_time = time_call(lambda: read(path), repeat)
+                size = os.path.getsize(path)
+                plain_size = plain_size or size
+                results[f"{format_type} {codec or 'none'}"] = (size, write_time, read_time)
+                print(f"  {format_type:<6} {codec or 'none':<5} {size / 1024 / 1024:8.2f} MB ({size / plain_size:4.0%})"
+                      f"  write {write_time:6.2f} s  read {read_time:6.2f} s")
+    return results
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Imamother scraper benchmarks')
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                       help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--corpus', help='Directory of saved HTML pages to use')
+    parser.add_argument('--pages', type=int, default=20,
+                       help='Number of synthetic pages when no corpus is given')
+    parser.add_argument('--posts', type=int, default=100000,
+                       help='Number of synthetic posts for the matcher benchmark')
+    parser.add_argument('--workers', type=int,
+                       help='Worker processes for the batch benchmark (default: one per CPU)')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Repetitions per measurement (best is reported)')
+
+    args = parser.parse_args()
+    selected = args.benchmarks or BENCHMARKS
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    corpus = load_page_corpus(args.corpus, args.pages)
+    if not corpus:
+        print("No pages found in corpus")
+        sys.exit(1)
+
+    print(f"Corpus: {len(corpus)} pages")
+    if 'parsers' in selected:
+        print("\nParser backends (extract_page_data):")
+        bench_parsers(corpus, args.repeat)
+    if 'partial' in selected:
+        print("\nPartial parsing (learned post selector):")
+        bench_partial_parse(corpus, args.repeat)
+    if 'templates' in selected:
+        print("\nField resolution (learned field paths):")
+        bench_templates(corpus, args.repeat)
+    if 'fallback' in selected:
+        print("\nFallback post detection (nested layout):")
+        bench_fallback(repeat=args.repeat)
+    if 'patterns' in selected:
+        print("\nContent pattern matching (per post):")
+        bench_patterns(build_sample_posts(), args.repeat)
+    if 'matcher' in selected:
+        print("\nContent analysis matching (all categories):")
+        bench_matcher(build_sample_posts(args.posts), args.repeat)
+    if 'mentions' in selected:
+        print("\nResource mentions (worst-case inputs):")
+        bench_mentions(args.repeat)
+    if 'cache' in selected:
+        print("\nContent analysis cache (repeated posts):")
+        bench_analysis_cache(build_sample_posts(), args.repeat)
+    if 'keywords' in selected:
+        print("\nTF-IDF keyword engine:")
+        bench_keywords(build_sample_posts(args.posts))
+    if 'taxonomy' in selected:
+        print("\nOpportunity categorization:")
+        bench_taxonomy(build_sample_posts(), args.repeat)
+    if 'sentiment' in selected:
+        print("\nSentiment scoring (one batch):")
+        bench_sentiment(build_sample_posts(args.posts), args.repeat)
+    if 'compression' in selected:
+        print("\nCompressed output (size and read time per codec):")
+        bench_compression(corpus, args.repeat)
+    if 'streaming' in selected:
+        print("\nStreaming extraction (long thread page):")
+        bench_streaming(repeat=args.repeat)
+    if 'batch' in selected:
+        print("\nBatch extraction (process pool):")
+        bench_batch(corpus, args.workers, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 """
 Business Intelligence Analyzer for Imamother Forum Data
 """
-import json
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple
@@ -9,27 +8,65 @@ from collections import Counter, defaultdict
 import re
 import os
 
+from tokenization import normalize, post_text, public_record
+from taxonomy import get_taxonomy
+from storage import PostStore, load_posts, is_data_file
+
 class BusinessIntelligenceAnalyzer:
     """Advanced analytics for scraped forum data"""
     
     def __init__(self):
         self.data = None
         self.df = None
+        self.store = None
+        self.taxonomy = get_taxonomy()
+        
+    def load_data(self, data_path: str, columns: List[str] = None) -> bool:
+        """Load scraped data from a JSON, JSON Lines or Parquet file, or a SQLite post store
         
-    def load_data(self, data_path: str) -> bool:
-        """Load scraped data from JSON file"""
+        Parquet files and post stores are read straight into the DataFrame,
+        and only `columns` (plus section and content) are read from them
+        when given. With a post store, keyword scans run as full-text
+        queries against it.
+        """
         try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            if columns:
+                columns = list(dict.fromkeys(['section', 'content'] + list(columns)))
+            self.store = None
             
-            # Convert to DataFrame for easier analysis
-            all_posts = []
-            for section, posts in self.data.items():
-                for post in posts:
-                    post['section'] = section
-                    all_posts.append(post)
+            if data_path.endswith('.parquet'):
+                self.data = None
+                self.df = pd.read_parquet(data_path, columns=columns)
+            elif data_path.endswith('.db'):
+                # Rows are indexed by their rowid in the store, which full-text queries return;
+                # the connection is closed once read and reopened by each query
+                self.data = None
+                with PostStore(data_path) as store:
+                    self.df = pd.DataFrame(list(store.iter_posts(columns)))
+                self.store = store
+                if 'rowid' in self.df:
+                    self.df = self.df.set_index('rowid')
+            else:
+                self.data = load_posts(data_path)
+                
+                # Convert to DataFrame for easier analysis
+                all_posts = []
+                texts = []
+                for section, posts in self.data.items():
+                    for post in posts:
+                        post['section'] = section
+                        texts.append(post_text(post))
+                        all_posts.append(public_record(post))
+                self.df = pd.DataFrame(all_posts)
             
-            self.df = pd.DataFrame(all_posts)
+            # Lowercased and matched against the opportunity taxonomy once
+            # here; the helpers below read these columns. Loaded records
+            # keep their normalized text, so it is computed once per post
+            if self.data is None:
+                texts = [normalize(content if isinstance(content, str) else None)
+                         for content in self.df.get('content', [])]
+            self.df['content_lower'] = [text.content for text in texts]
+            self.df['opportunity_mentions'] = [self.taxonomy.mentioned(text.content, text.words) for text in texts]
             return True
             
         except Exception as e:
@@ -55,15 +92,7 @@ class BusinessIntelligenceAnalyzer:
     
     def _analyze_product_opportunities(self) -> Dict[str, Any]:
         """Analyze product-related opportunities"""
-        product_keywords = [
-            'product', 'buy', 'purchase', 'recommend', 'brand', 'quality',
-            'where to find', 'best', 'review', 'comparison', 'price', 'cost',
-            'store', 'online', 'amazon', 'target', 'walmart'
-        ]
-        
-        product_posts = self.df[
-            self.df['content'].str.contains('|'.join(product_keywords), case=False, na=False)
-        ]
+        product_posts = self._opportunity_posts('product')
         
         # Extract mentioned products/brands
         product_mentions = []
@@ -84,15 +113,7 @@ class BusinessIntelligenceAnalyzer:
     
     def _analyze_service_opportunities(self) -> Dict[str, Any]:
         """Analyze service-related opportunities"""
-        service_keywords = [
-            'service', 'help', 'professional', 'expert', 'consultation',
-            'advice', 'guidance', 'support', 'therapy', 'counseling',
-            'doctor', 'specialist', 'coach', 'trainer', 'tutor'
-        ]
-        
-        service_posts = self.df[
-            self.df['content'].str.contains('|'.join(service_keywords), case=False, na=False)
-        ]
+        service_posts = self._opportunity_posts('service')
         
         # Categorize service types
         service_categories = {
@@ -104,9 +125,7 @@ class BusinessIntelligenceAnalyzer:
         
         category_counts = {}
         for category, keywords in service_categories.items():
-            category_posts = service_posts[
-                service_posts['content'].str.contains('|'.join(keywords), case=False, na=False)
-            ]
+            category_posts = self._containing(service_posts, keywords)
             category_counts[category] = len(category_posts)
         
         return {
@@ -119,15 +138,7 @@ class BusinessIntelligenceAnalyzer:
     
     def _analyze_content_opportunities(self) -> Dict[str, Any]:
         """Analyze content and information opportunities"""
-        content_keywords = [
-            'information', 'learn', 'understand', 'explain', 'guide',
-            'tutorial', 'how to', 'what is', 'resource', 'book',
-            'article', 'website', 'blog', 'video', 'course'
-        ]
-        
-        content_posts = self.df[
-            self.df['content'].str.contains('|'.join(content_keywords), case=False, na=False)
-        ]
+        content_posts = self._opportunity_posts('information')
         
         # Extract topics people want to learn about
         learning_topics = []
@@ -151,15 +162,7 @@ class BusinessIntelligenceAnalyzer:
     
     def _analyze_community_opportunities(self) -> Dict[str, Any]:
         """Analyze community and social opportunities"""
-        community_keywords = [
-            'group', 'community', 'support', 'meet', 'connect',
-            'share', 'experience', 'similar', 'together', 'local',
-            'meetup', 'event', 'gathering', 'club'
-        ]
-        
-        community_posts = self.df[
-            self.df['content'].str.contains('|'.join(community_keywords), case=False, na=False)
-        ]
+        community_posts = self._opportunity_posts('community')
         
         return {
             'total_community_posts': len(community_posts),
@@ -194,9 +197,7 @@ class BusinessIntelligenceAnalyzer:
             'help', 'desperate', 'confused', 'lost'
         ]
         
-        pain_posts = self.df[
-            self.df['content'].str.contains('|'.join(pain_keywords), case=False, na=False)
-        ]
+        pain_posts = self._containing(self.df, pain_keywords)
         
         # Extract pain point themes
         pain_points = []
@@ -246,6 +247,22 @@ class BusinessIntelligenceAnalyzer:
         
         return gaps_by_section
     
+    def _opportunity_posts(self, category: str) -> pd.DataFrame:
+        """Posts whose content mentions a taxonomy category's keywords or related terms"""
+        return self.df[self.df['opportunity_mentions'].map(lambda mentioned: category in mentioned)]
+    
+    def _containing(self, posts_df: pd.DataFrame, keywords: List[str]) -> pd.DataFrame:
+        """Posts whose lowercased content contains any of the keywords
+        
+        With a post store loaded, its full-text index finds them instead of
+        a scan of every post's content; trigram queries need keywords of
+        three or more characters.
+        """
+        if self.store is not None and min(len(keyword) for keyword in keywords) >= 3:
+            with self.store as store:
+                return posts_df[posts_df.index.isin(store.matching(keywords))]
+        return posts_df[posts_df['content_lower'].str.contains('|'.join(keywords), na=False)]
+    
     def _get_high_engagement_posts(self, posts_df: pd.DataFrame, category: str) -> List[Dict]:
         """Get high engagement posts for a category"""
         if posts_df.empty:
@@ -299,8 +316,8 @@ class BusinessIntelligenceAnalyzer:
         format_counts = {}
         for format_name, keywords in formats.items():
             count = 0
-            for content in content_posts['content']:
-                if any(keyword in str(content).lower() for keyword in keywords):
+            for content in content_posts['content_lower']:
+                if any(keyword in content for keyword in keywords):
                     count += 1
             format_counts[format_name] = count
         
@@ -309,8 +326,7 @@ class BusinessIntelligenceAnalyzer:
     def _identify_knowledge_gaps(self, content_posts: pd.DataFrame) -> List[str]:
         """Identify knowledge gaps"""
         gaps = []
-        for content in content_posts['content']:
-            content_str = str(content).lower()
+        for content_str in content_posts['content_lower']:
             if 'don\'t know' in content_str or 'not sure' in content_str or 'confused' in content_str:
                 # Extract the topic they're confused about
                 sentences = content_str.split('.')
@@ -324,8 +340,7 @@ class BusinessIntelligenceAnalyzer:
     def _identify_community_needs(self, community_posts: pd.DataFrame) -> List[str]:
         """Identify community needs"""
         needs = []
-        for content in community_posts['content']:
-            content_str = str(content).lower()
+        for content_str in community_posts['content_lower']:
             if 'looking for' in content_str or 'need' in content_str or 'want to connect' in content_str:
                 sentences = content_str.split('.')
                 for sentence in sentences:
@@ -343,8 +358,8 @@ class BusinessIntelligenceAnalyzer:
         
         location_counts = {}
         for location in locations:
-            count = sum(1 for content in community_posts['content'] 
-                       if location in str(content).lower())
+            count = sum(1 for content in community_posts['content_lower'] 
+                       if location in content)
             if count > 0:
                 location_counts[location] = count
         
@@ -355,8 +370,7 @@ class BusinessIntelligenceAnalyzer:
         support_keywords = ['support group', 'support', 'group', 'meet others', 'similar situation']
         
         support_opportunities = []
-        for content in community_posts['content']:
-            content_str = str(content).lower()
+        for content_str in community_posts['content_lower']:
             if any(keyword in content_str for keyword in support_keywords):
                 # Extract the type of support needed
                 sentences = content_str.split('.')
@@ -380,9 +394,7 @@ class BusinessIntelligenceAnalyzer:
         for season, keywords in seasonal_keywords.items():
             topics = []
             for keyword in keywords:
-                posts_with_keyword = self.df[
-                    self.df['content'].str.contains(keyword, case=False, na=False)
-                ]
+                posts_with_keyword = self._containing(self.df, [keyword])
                 if not posts_with_keyword.empty:
                     topics.append(f"{keyword}: {len(posts_with_keyword)} posts")
             seasonal_topics[season] = topics
@@ -454,7 +466,7 @@ def main():
     # Look for the most recent data file
     data_dir = "scraped_data"
     if os.path.exists(data_dir):
-        json_files = [f for f in os.listdir(data_dir) if f.endswith('.json') and 'imamother_scrape' in f]
+        json_files = [f for f in os.listdir(data_dir) if is_data_file(f) and 'imamother_scrape' in f]
         if json_files:
             latest_file = max(json_files, key=lambda f: os.path.getctime(os.path.join(data_dir, f)))
             data_path = os.path.join(data_dir, latest_file)
@@ -41,10 +41,43 @@ class ScrapingConfig:
     EXTRACT_IMAGES = False
     EXTRACT_ATTACHMENTS = False
     
+    # Parser settings
+    PARSER_BACKEND = "lxml"  # BeautifulSoup tree builder: 'lxml' or 'html.parser'
+    PARSER_FALLBACK = "html.parser"  # Used when PARSER_BACKEND is not installed
+    
+    # Partial parsing: build only the subtrees that can contain posts, keyed off
+    # the section's learned post selector unless tag/class filters are given.
+    # Pages where the restricted parse finds no posts are parsed in full.
+    PARTIAL_PARSE = False
+    PARTIAL_PARSE_TAGS: List[str] = []
+    PARTIAL_PARSE_CLASSES: List[str] = []
+    
+    # Streaming extraction: parse pages event by event and build only post
+    # containers matching the learned selector (lxml only, see StreamingDataExtractor)
+    STREAMING_EXTRACTION = False
+    
+    # Batch extraction (DataExtractor.extract_many) of stored pages
+    EXTRACTION_WORKERS = None  # Worker processes, None for one per CPU
+    EXTRACTION_CHUNK_SIZE = 8  # Pages sent to a worker at a time
+    
+    # Field templates: learn the DOM path of each post field from a section's
+    # first pages and resolve fields through it, re-learning when too few fields
+    # still come from their path (a layout change). Off by default: on the
+    # sample corpus it is slower than the cascade (`benchmarks.py templates`)
+    FIELD_TEMPLATES = False
+    TEMPLATE_LEARNING_PAGES = 2
+    TEMPLATE_MIN_SUPPORT = 0.8  # Share of posts a path must cover to be kept
+    TEMPLATE_MIN_HIT_RATE = 0.7  # Re-learn below this share of fields per page
+    
     # Output settings
     OUTPUT_DIR = "scraped_data"
-    OUTPUT_FORMATS = ['json', 'csv']
+    OUTPUT_FORMATS = ['jsonl', 'csv']  # 'jsonl'/'csv'/'sqlite' are written page by page while scraping; 'json'/'parquet' ('parquet' needs pyarrow) keep every post in memory until the end of the run
     BACKUP_ENABLED = True
+    SELECTOR_PLAN_FILE = "selector_plan.json"  # Learned post selectors, kept in OUTPUT_DIR
+    ARCHIVE_PAGES = True  # Keep fetched HTML for re-extraction without refetching
+    ARCHIVE_DIR = "page_archive"  # Compressed page records and their index, kept in OUTPUT_DIR
+    OUTPUT_COMPRESSION = {}  # Codec per format, e.g. {'json': 'zstd', 'csv': 'gzip'}: 'gzip', 'xz' or 'zstd' (needs zstandard)
+    SQLITE_FILE = "imamother_posts.db"  # Post store shared by every run with 'sqlite' output, kept in OUTPUT_DIR
     
     # Logging settings
     LOG_LEVEL = "INFO"
@@ -59,9 +92,29 @@ class ScrapingConfig:
     
     # Business intelligence settings
     EXTRACT_KEYWORDS = True
-    ANALYZE_SENTIMENT = False
+    ANALYZE_SENTIMENT = False  # Lexicon polarity and intensity per post, scored in the analysis stage
     TRACK_ENGAGEMENT = True
     IDENTIFY_TRENDS = True
+    TAXONOMY_FILE = None  # JSON opportunity taxonomy replacing taxonomy.DEFAULT_TAXONOMY
+    
+    # Extra content patterns per group (question_indicators, answer_indicators,
+    # resource_mentions, emotional_indicators), compiled alongside the defaults
+    CUSTOM_PATTERNS: Dict[str, List[str]] = {}
+    
+    # Content analysis: 'inline' analyzes each post as it is extracted,
+    # 'deferred' saves raw posts and leaves analysis to `main.py --analyze`
+    ANALYSIS_MODE = "inline"
+    
+    # Keyword ranking: 'frequency' keeps each post's most frequent words,
+    # 'tfidf' ranks them by TF-IDF over the whole dataset in the analysis stage
+    # and adds the top terms per section and per KEYWORD_TIME_WINDOW
+    # ('year', 'month' or 'day') to the summary statistics
+    KEYWORD_SCORING = "frequency"
+    KEYWORD_TIME_WINDOW = "month"
+    
+    # Posts whose content was already analyzed reuse the stored analysis;
+    # the cache is emptied when the content patterns change
+    ANALYSIS_CACHE_SIZE = 10000  # Entries kept, 0 to disable
     
     @classmethod
     def get_credentials(cls) -> Dict[str, str]:
@@ -0,0 +1,191 @@
+"""
+Single-pass matcher over every content indicator category
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Pattern
+
+from tokenization import WORD_PATTERN
+
+# A pattern made only of plain characters and escaped punctuation
+_LITERAL_PATTERN = re.compile(r'(?:[^\\.^$*+?{}\[\]|()]|\\[^\w])+')
+_ESCAPE = re.compile(r'\\(.)')
+
+def pattern_literal(pattern: str) -> str:
+    """The literal text a pattern matches, or '' if it is a real regular expression"""
+    if not _LITERAL_PATTERN.fullmatch(pattern):
+        return ''
+    return _ESCAPE.sub(r'\1', pattern)
+
+def _trie_regex(literals: List[str]) -> str:
+    """Regex matching the longest of `literals` at a position, one character at a time"""
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional tail: the longest literal through this node wins
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+class MatchResult:
+    """Category hits of one text"""
+
+    def __init__(self):
+        self.patterns: Dict[str, Set[str]] = {}
+        self.words: Dict[str, Set[str]] = {}
+
+    def matched(self, group: str) -> Set[str]:
+        """Raw patterns of a group found in the text"""
+        return self.patterns.get(group, set())
+
+    def mentions(self, group: str) -> Set[str]:
+        """Whole words matched by a word group's patterns"""
+        return self.words.get(group, set())
+
+# Distinct tokens whose literals are remembered before the memo is reset
+TOKEN_MEMO_SIZE = 100000
+
+# Fewer phrases than this are each searched for directly, which beats a
+# trie regex until there are many of them
+PHRASE_TRIE_MIN = 16
+
+class CategoryMatcher:
+    """Finds the hits of every pattern group in one pass over the text
+
+    A literal made only of word characters (most defaults) can only occur
+    inside a single \\w+ token, so each distinct token of the text is
+    looked up once in a memo of the literals it contains. A word group's
+    mentions are the tokens containing one of its literals, which is what
+    its `\\b\\w*pattern\\w*\\b` regex matches.
+
+    Phrase literals (spaces or punctuation) are searched for one by one
+    when there are few. Many phrases are compiled into one trie regex
+    run over the lowercased text, which finds the longest phrase at
+    each match position. Any literal contained in a found one occurs too;
+    a phrase that starts inside a found one and runs past its end is
+    looked for only at the offsets where the found phrase's tail begins
+    another. Patterns that are real regular expressions keep their own
+    compiled regex.
+    """
+
+    def __init__(self, groups: Dict[str, List[Tuple[str, Pattern]]], word_groups: Set[str]):
+        self.word_groups = word_groups
+        # literal -> [(group, raw pattern)]
+        self.owners: Dict[str, List[Tuple[str, str]]] = {}
+        self.fallback: List[Tuple[str, str, Pattern]] = []
+
+        for group, patterns in groups.items():
+            for raw, compiled in patterns:
+                literal = pattern_literal(raw).lower()
+                if not literal or (group in word_groups and not WORD_PATTERN.fullmatch(literal)):
+                    self.fallback.append((group, raw, compiled))
+                    continue
+                self.owners.setdefault(literal, []).append((group, raw))
+
+        self.word_literals = [literal for literal in self.owners if WORD_PATTERN.fullmatch(literal)]
+        phrases = [literal for literal in self.owners if not WORD_PATTERN.fullmatch(literal)]
+        # literal -> word groups it belongs to
+        self.word_owners: Dict[str, Set[str]] = {
+            literal: {group for group, _ in self.owners[literal] if group in word_groups} for literal in self.word_literals
+        }
+        self._token_memo: Dict[str, Tuple[str, ...]] = {}
+
+        # phrase -> phrases it contains, itself included
+        self.contained: Dict[str, List[str]] = {
+            phrase: [other for other in phrases if other in phrase] for phrase in phrases
+        }
+
+        # phrase -> offsets inside it where another phrase may start and run past its end
+        self.overlaps: Dict[str, List[int]] = {
+            phrase: [offset for offset in range(1, len(phrase))
+                     if any(len(other) > len(phrase) - offset and other.startswith(phrase[offset:])
+                            for other in phrases)]
+            for phrase in phrases
+        }
+
+        self.phrases = phrases
+        self.scanner = None
+        if len(phrases) >= PHRASE_TRIE_MIN:
+            # A plain trie (no leading lookahead or IGNORECASE) lets the engine
+            # skip straight to positions where a phrase can start
+            self.scanner = re.compile(_trie_regex(phrases))
+
+    def scan(self, text: str, words: Optional[Iterable[str]] = None) -> MatchResult:
+        """Hits of every group in text, as if each pattern were searched on its own
+
+        `words` are the text's \\w+ tokens when the caller already has them.
+        """
+        result = MatchResult()
+        present = set()
+
+        for token in set(WORD_PATTERN.findall(text) if words is None else words):
+            literals = self._token_literals(token)
+            if not literals:
+                continue
+            present.update(literals)
+            for literal in literals:
+                for group in self.word_owners[literal]:
+                    result.words.setdefault(group, set()).add(token)
+
+        if self.phrases:
+            lowered = text.lower()
+            if self.scanner is None:
+                present.update(phrase for phrase in self.phrases if phrase in lowered)
+            else:
+                for found in self._found_phrases(lowered):
+                    present.update(self.contained[found])
+
+        for literal in present:
+            for group, raw in self.owners[literal]:
+                result.patterns.setdefault(group, set()).add(raw)
+
+        for group, raw, compiled in self.fallback:
+            if group in self.word_groups:
+                matched_words = {match.group() for match in compiled.finditer(text)}
+                if matched_words:
+                    result.patterns.setdefault(group, set()).add(raw)
+                    result.words.setdefault(group, set()).update(matched_words)
+            elif compiled.search(text):
+                result.patterns.setdefault(group, set()).add(raw)
+
+        return result
+
+    def _token_literals(self, token: str) -> Tuple[str, ...]:
+        """Word literals contained in a token, ignoring case"""
+        literals = self._token_memo.get(token)
+        if literals is None:
+            if len(self._token_memo) >= TOKEN_MEMO_SIZE:
+                self._token_memo.clear()
+            lowered = token.lower()
+            literals = self._token_memo[token] = tuple(literal for literal in self.word_literals if literal in lowered)
+        return literals
+
+    def _found_phrases(self, text: str) -> Set[str]:
+        """Phrases in lowercased text: the longest at each position one starts, and the overlapping ones"""
+        found = set()
+        match_at = self.scanner.match
+        for match in self.scanner.finditer(text):
+            phrase = match.group()
+            found.add(phrase)
+            for offset in self.overlaps[phrase]:
+                inner = match_at(text, match.start() + offset)
+                if inner:
+                    found.add(inner.group())
+        return found
+
+    def mentions(self, text: str, group: str, words: Optional[Iterable[str]] = None) -> Set[str]:
+        """Whole words of text matched by one word group, from a single tokenization"""
+        mentions = {token for token in set(WORD_PATTERN.findall(text) if words is None else words)
+                    if any(group in self.word_owners[literal] for literal in self._token_literals(token))}
+        for fallback_group, _, compiled in self.fallback:
+            if fallback_group == group:
+                mentions.update(match.group() for match in compiled.finditer(text))
+        return mentions
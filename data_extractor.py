@@ -1,60 +1,97 @@
 """
 Data extraction module for parsing Imamother forum content
 """
-import re
+import os
+import json
+import codecs
 import logging
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from bs4 import BeautifulSoup, Tag
+from itertools import islice
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator, Tuple
+from bs4 import BeautifulSoup, SoupStrainer, Tag, FeatureNotFound
+from bs4.dammit import EncodingDetector
 from urllib.parse import urljoin, urlparse
 
+try:
+    from lxml import etree
+except ImportError:  # Only streaming extraction needs lxml directly
+    etree = None
+
+from config import ScrapingConfig
+from patterns import PatternRegistry, POST_MARKER_PATTERNS, NUMBER_PATTERN
+from post_scanner import PostScan, SubtreeSummary, FIELD_SELECTORS, summarize_subtrees, selector_strainer, class_strainer, element_matcher
+from field_templates import SectionTemplate, TEMPLATE_FIELDS, element_path
+from tokenization import PostText, normalize, post_text, public_record
+from analysis_cache import AnalysisCache
+from keyword_engine import corpus_keywords, keyword_terms
+from sentiment import SentimentScorer
+
+# Values of ScrapingConfig.ANALYSIS_MODE
+ANALYSIS_MODES = ('inline', 'deferred')
+
 class DataExtractor:
     """Handles extraction of structured data from forum pages"""
     
-    def __init__(self):
+    # Post container selectors, tried in order until one matches
+    POST_SELECTORS = [
+        '.post', '.message', '.forum-post', '.topic-post',
+        '[class*="post"]', '[class*="message"]', '.thread-item'
+    ]
+    
+    def __init__(self, config: ScrapingConfig = None):
+        self.config = config or ScrapingConfig()
         self.logger = logging.getLogger(__name__)
+        self.parser_backend = self._resolve_parser_backend()
         
-        # Common patterns for data extraction
-        self.patterns = {
-            'question_indicators': [
-                r'\?', r'how to', r'what is', r'where can', r'when should',
-                r'why does', r'help', r'advice', r'suggestions', r'recommendations'
-            ],
-            'answer_indicators': [
-                r'try this', r'i suggest', r'in my experience', r'you should',
-                r'i recommend', r'what worked for me', r'here\'s what'
-            ],
-            'resource_mentions': [
-                r'book', r'website', r'article', r'doctor', r'specialist',
-                r'product', r'service', r'app', r'tool', r'resource'
-            ],
-            'emotional_indicators': [
-                r'worried', r'scared', r'excited', r'frustrated', r'happy',
-                r'sad', r'anxious', r'grateful', r'confused', r'hopeful'
-            ]
-        }
+        if self.config.ANALYSIS_MODE not in ANALYSIS_MODES:
+            raise ValueError(f"Unsupported ANALYSIS_MODE: {self.config.ANALYSIS_MODE!r} "
+                             f"(expected one of {', '.join(ANALYSIS_MODES)})")
+        
+        # Winning post selector and field paths per section, learned across pages and runs
+        self.selector_plan: Dict[str, Dict[str, Any]] = {}
+        self.field_templates: Dict[str, SectionTemplate] = {}
+        
+        # Content patterns, compiled once per extractor
+        self.patterns = PatternRegistry(self.config.CUSTOM_PATTERNS)
+        
+        # Analysis of content seen before, e.g. quoted or sticky posts
+        self.analysis_cache = AnalysisCache(self.config.ANALYSIS_CACHE_SIZE)
+        
+        # Top TF-IDF terms per section and time window, from the last analysis stage run
+        self.corpus_keywords: Dict[str, Dict[str, List[str]]] = {}
+        self.sentiment = SentimentScorer() if self.config.ANALYZE_SENTIMENT else None
+    
+    def _resolve_parser_backend(self) -> str:
+        """Pick the BeautifulSoup tree builder, falling back if it is not installed
+
+        Parity guarantee: for well-formed pages (balanced tags, declared
+        charset) every backend yields the same post records. Backends repair
+        broken markup differently, so pages with unclosed or stray tags may
+        group posts differently; use the fallback parser to reproduce output
+        from runs made before lxml became the default.
+        """
+        backend = self.config.PARSER_BACKEND
+        try:
+            BeautifulSoup('', backend)
+            return backend
+        except FeatureNotFound:
+            fallback = self.config.PARSER_FALLBACK
+            self.logger.warning(f"Parser backend '{backend}' not available, falling back to '{fallback}'")
+            return fallback
     
     def extract_page_data(self, html_content: str, section_name: str) -> List[Dict]:
         """Extract structured data from a forum page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
         posts_data = []
         
-        # Try different selectors for forum posts
-        post_selectors = [
-            '.post', '.message', '.forum-post', '.topic-post',
-            '[class*="post"]', '[class*="message"]', '.thread-item'
-        ]
-        
         posts = []
-        for selector in post_selectors:
-            posts = soup.select(selector)
-            if posts:
-                self.logger.debug(f"Found {len(posts)} posts using selector: {selector}")
-                break
+        if self.config.PARTIAL_PARSE:
+            posts = self._find_posts_partial(html_content, section_name)
         
         if not posts:
-            # Fallback: look for common forum structures
-            posts = self._find_posts_fallback(soup)
+            soup = BeautifulSoup(html_content, self.parser_backend)
+            posts = self._find_posts(soup, section_name)
         
         for post in posts:
             try:
@@ -65,36 +102,191 @@ class DataExtractor:
                 self.logger.warning(f"Error extracting post data: {e}")
                 continue
         
+        self._update_field_template(section_name)
         return posts_data
     
+    def extract_many(self, pages: Iterable[Tuple[bytes, str]], workers: int = None,
+                     chunk_size: int = None) -> Iterator[List[Dict]]:
+        """Extract many (html, section) pages on a process pool, yielding each page's posts in order
+        
+        Pages are sent to the workers in chunks, and only a few chunks per
+        worker are in flight at once, so `pages` can be a lazy stream of
+        stored pages. Every worker starts from this extractor's selector plan
+        and learns on its own from there.
+        """
+        workers = workers or self.config.EXTRACTION_WORKERS or os.cpu_count() or 1
+        chunk_size = chunk_size or self.config.EXTRACTION_CHUNK_SIZE
+        pages = iter(pages)
+        
+        if workers == 1:
+            for html_content, section_name in pages:
+                yield self.extract_page_data(html_content, section_name)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_extraction_worker,
+                                 initargs=(type(self), self.config, self.selector_plan)) as executor:
+            pending = deque()
+            while True:
+                # Keep every worker busy without reading the whole input ahead
+                while len(pending) < workers * 2:
+                    chunk = list(islice(pages, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_extract_chunk, chunk))
+                if not pending:
+                    break
+                results, cache_counts = pending.popleft().result()
+                self.analysis_cache.add_counts(*cache_counts)
+                yield from results
+    
+    def _find_posts_partial(self, html_content: str, section_name: str) -> List[Tag]:
+        """Find posts by parsing only the subtrees that can contain them"""
+        tags = self.config.PARTIAL_PARSE_TAGS
+        classes = self.config.PARTIAL_PARSE_CLASSES
+        if tags or classes:
+            # Configured containers: run the usual post discovery inside them
+            if classes:
+                strainer = class_strainer(classes, name=tags or None)
+            else:
+                strainer = SoupStrainer(tags)
+            soup = BeautifulSoup(html_content, self.parser_backend, parse_only=strainer)
+            return self._find_posts(soup, section_name)
+        
+        # Otherwise keep only elements matching the section's learned selector
+        selector = self.selector_plan.get(section_name, {}).get('post_selector')
+        if not selector:
+            return []
+        
+        soup = BeautifulSoup(html_content, self.parser_backend, parse_only=selector_strainer(selector))
+        posts = soup.select(selector)
+        if not posts:
+            self.logger.debug(f"Partial parse found no posts in {section_name}, parsing full page")
+        return posts
+    
+    def _find_posts(self, soup: BeautifulSoup, section_name: str) -> List[Tag]:
+        """Find post elements, trying the section's learned selector first"""
+        cached_selector = self.selector_plan.get(section_name, {}).get('post_selector')
+        if cached_selector:
+            posts = soup.select(cached_selector)
+            if posts:
+                return posts
+            self.logger.debug(f"Cached selector {cached_selector} found no posts in {section_name}, re-running cascade")
+        
+        # Try different selectors for forum posts
+        for selector in self.POST_SELECTORS:
+            if selector == cached_selector:
+                continue
+            posts = soup.select(selector)
+            if posts:
+                self.logger.debug(f"Found {len(posts)} posts using selector: {selector}")
+                if cached_selector:
+                    # Field paths start at the post container, so they go with it
+                    self._forget_field_template(section_name)
+                self.selector_plan.setdefault(section_name, {})['post_selector'] = selector
+                return posts
+        
+        # Fallback: look for common forum structures
+        return self._find_posts_fallback(soup)
+    
+    def load_selector_plan(self, filepath: str) -> bool:
+        """Load learned per-section selectors saved by a previous run"""
+        if not os.path.exists(filepath):
+            return False
+        
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                self.selector_plan = json.load(f)
+            self.field_templates = {}
+            self.logger.info(f"Loaded selector plan for {len(self.selector_plan)} sections from {filepath}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Error loading selector plan {filepath}: {e}")
+            return False
+    
+    def save_selector_plan(self, filepath: str):
+        """Persist learned per-section selectors so later runs start warm"""
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.selector_plan, f, indent=2)
+            self.logger.debug(f"Selector plan saved to {filepath}")
+        except Exception as e:
+            self.logger.warning(f"Error saving selector plan {filepath}: {e}")
+    
+    def _field_template(self, section_name: str) -> Optional[SectionTemplate]:
+        """Field template of a section, built from the selector plan on first use"""
+        if not self.config.FIELD_TEMPLATES:
+            return None
+        if section_name not in self.field_templates:
+            paths = self.selector_plan.get(section_name, {}).get('field_paths')
+            self.field_templates[section_name] = SectionTemplate(paths)
+        return self.field_templates[section_name]
+    
+    def _forget_field_template(self, section_name: str):
+        """Drop a section's field paths so they are learned again"""
+        self.field_templates.pop(section_name, None)
+        self.selector_plan.get(section_name, {}).pop('field_paths', None)
+    
+    def _observe_fields(self, template: SectionTemplate, scan: PostScan):
+        """Feed the elements a post's fields were resolved to into the template"""
+        for field in TEMPLATE_FIELDS:
+            element = scan.accepted.get(field)
+            if template.learning:
+                if element is not None:
+                    path = element_path(element, scan.element)
+                    if path is not None:
+                        template.observe(field, path)
+            elif field in template.paths and element is not None:
+                template.record(field, element is scan.located.get(field))
+    
+    def _update_field_template(self, section_name: str):
+        """After a page: compile paths once enough pages are seen, or re-learn on drift"""
+        template = self.field_templates.get(section_name)
+        if template is None:
+            return
+        
+        if template.learning:
+            template.pages_observed += 1
+            if template.pages_observed < self.config.TEMPLATE_LEARNING_PAGES:
+                return
+            if template.compile(self.config.TEMPLATE_MIN_SUPPORT):
+                self.selector_plan.setdefault(section_name, {})['field_paths'] = template.to_json()
+                self.logger.info(f"Learned field paths for {section_name}: {', '.join(template.paths)}")
+            template.pages_observed = 0
+            return
+        
+        hit_rate = template.hit_rate()
+        template.reset_stats()
+        if hit_rate is not None and hit_rate < self.config.TEMPLATE_MIN_HIT_RATE:
+            self.logger.warning(f"Field paths for {section_name} hit {hit_rate:.0%} of fields, re-learning")
+            self._forget_field_template(section_name)
+    
     def _find_posts_fallback(self, soup: BeautifulSoup) -> List[Tag]:
         """Fallback method to find posts when standard selectors fail"""
         posts = []
         
-        # Look for elements with post-like characteristics
-        potential_posts = soup.find_all(['div', 'article', 'section'])
+        # Look for elements with post-like characteristics, summarizing
+        # every candidate's text and markers in one bottom-up pass
+        potential_posts = summarize_subtrees(soup, ['div', 'article', 'section'], POST_MARKER_PATTERNS)
         
-        for element in potential_posts:
+        for element, summary in potential_posts:
             # Check if element contains typical post content
-            if self._looks_like_post(element):
+            if self._looks_like_post(summary):
                 posts.append(element)
         
         return posts
     
-    def _looks_like_post(self, element: Tag) -> bool:
+    def _looks_like_post(self, summary: SubtreeSummary) -> bool:
         """Determine if an element looks like a forum post"""
-        text = element.get_text().strip()
-        
         # Must have substantial text content
-        if len(text) < 50:
+        if summary.text_length < 50:
             return False
         
         # Look for post indicators
         indicators = [
-            element.find(class_=re.compile(r'author|user|poster')),
-            element.find(class_=re.compile(r'date|time|timestamp')),
-            element.find(class_=re.compile(r'content|body|message')),
-            len(text.split()) > 10  # Has multiple words
+            summary.markers['author'],
+            summary.markers['date'],
+            summary.markers['content'],
+            summary.word_count > 10  # Has multiple words
         ]
         
         return sum(bool(indicator) for indicator in indicators) >= 2
@@ -102,32 +294,41 @@ class DataExtractor:
     def _extract_post_data(self, post_element: Tag, section_name: str) -> Optional[Dict]:
         """Extract structured data from a single post"""
         try:
+            # Collect every field candidate in one walk of the post subtree,
+            # skipping fields the section's learned paths should resolve
+            template = self._field_template(section_name)
+            scan = PostScan(post_element, template.paths if template else None)
+            
             # Extract basic post information
             post_data = {
                 'section': section_name,
                 'extracted_at': datetime.now().isoformat(),
-                'post_id': self._extract_post_id(post_element),
-                'author': self._extract_author(post_element),
-                'timestamp': self._extract_timestamp(post_element),
-                'content': self._extract_content(post_element),
-                'title': self._extract_title(post_element),
-                'replies_count': self._extract_replies_count(post_element),
-                'views_count': self._extract_views_count(post_element),
-                'tags': self._extract_tags(post_element),
-                'links': self._extract_links(post_element),
+                'post_id': self._extract_post_id(post_element, scan),
+                'author': self._extract_author(scan),
+                'timestamp': self._extract_timestamp(scan),
+                'content': self._extract_content(post_element, scan),
+                'title': self._extract_title(scan),
+                'replies_count': self._extract_replies_count(scan),
+                'views_count': self._extract_views_count(scan),
+                'tags': self._extract_tags(scan),
+                'links': self._extract_links(scan),
                 'is_question': False,
                 'is_answer': False,
                 'sentiment_indicators': [],
                 'resource_mentions': [],
-                'keywords': []
+                'keywords': [],
+                'analyzed_with': None
             }
             
-            # Analyze content for business intelligence
-            if post_data['content']:
-                post_data.update(self._analyze_content(post_data['content']))
+            # Analyze content for business intelligence, unless it is left
+            # to the separate analysis stage (analyze_posts)
+            if post_data['content'] and self.config.ANALYSIS_MODE == 'inline':
+                post_data.update(self._cached_analysis(post_data))
             
             # Only return posts with meaningful content
             if post_data['content'] and len(post_data['content'].strip()) > 20:
+                if template:
+                    self._observe_fields(template, scan)
                 return post_data
             
         except Exception as e:
@@ -135,7 +336,7 @@ class DataExtractor:
         
         return None
     
-    def _extract_post_id(self, element: Tag) -> Optional[str]:
+    def _extract_post_id(self, element: Tag, scan: PostScan) -> Optional[str]:
         """Extract post ID"""
         # Try common ID attributes
         for attr in ['id', 'data-post-id', 'data-id', 'data-message-id']:
@@ -143,26 +344,18 @@ class DataExtractor:
                 return str(element.get(attr))
         
         # Try to find ID in child elements
-        id_element = element.find(attrs={'id': re.compile(r'post|message')})
-        if id_element:
-            return id_element.get('id')
+        if scan.id_elements:
+            return scan.id_elements[0].get('id')
         
         return None
     
-    def _extract_author(self, element: Tag) -> Optional[str]:
+    def _extract_author(self, scan: PostScan) -> Optional[str]:
         """Extract post author"""
-        # Try common author selectors
-        author_selectors = [
-            '.author', '.username', '.poster', '.user-name',
-            '[class*="author"]', '[class*="user"]', '[class*="poster"]'
-        ]
-        
-        for selector in author_selectors:
-            author_element = element.select_one(selector)
-            if author_element:
-                author = author_element.get_text().strip()
-                if author:
-                    return self._anonymize_username(author)
+        for author_element in scan.candidates('author'):
+            author = author_element.get_text().strip()
+            if author:
+                scan.accept('author', author_element)
+                return self._anonymize_username(author)
         
         return None
     
@@ -174,31 +367,26 @@ class DataExtractor:
         # Keep first and last character, replace middle with X's
         return username[0] + "X" * (len(username) - 2) + username[-1]
     
-    def _extract_timestamp(self, element: Tag) -> Optional[str]:
+    def _extract_timestamp(self, scan: PostScan) -> Optional[str]:
         """Extract post timestamp"""
-        # Try common timestamp selectors
-        time_selectors = [
-            '.timestamp', '.date', '.time', '.posted-date',
-            '[class*="time"]', '[class*="date"]', 'time'
-        ]
-        
-        for selector in time_selectors:
-            time_element = element.select_one(selector)
-            if time_element:
-                # Try datetime attribute first
-                datetime_attr = time_element.get('datetime')
-                if datetime_attr:
-                    return datetime_attr
-                
-                # Try title attribute
-                title_attr = time_element.get('title')
-                if title_attr:
-                    return title_attr
-                
-                # Use text content
-                time_text = time_element.get_text().strip()
-                if time_text:
-                    return self._parse_relative_time(time_text)
+        for time_element in scan.candidates('timestamp'):
+            # Try datetime attribute first
+            datetime_attr = time_element.get('datetime')
+            if datetime_attr:
+                scan.accept('timestamp', time_element)
+                return datetime_attr
+            
+            # Try title attribute
+            title_attr = time_element.get('title')
+            if title_attr:
+                scan.accept('timestamp', time_element)
+                return title_attr
+            
+            # Use text content
+            time_text = time_element.get_text().strip()
+            if time_text:
+                scan.accept('timestamp', time_element)
+                return self._parse_relative_time(time_text)
         
         return None
     
@@ -209,126 +397,91 @@ class DataExtractor:
         
         if 'ago' in time_text:
             if 'minute' in time_text:
-                minutes = re.search(r'(\d+)', time_text)
+                minutes = NUMBER_PATTERN.search(time_text)
                 if minutes:
-                    return (now - timedelta(minutes=int(minutes.group(1)))).isoformat()
+                    return (now - timedelta(minutes=int(minutes.group()))).isoformat()
             elif 'hour' in time_text:
-                hours = re.search(r'(\d+)', time_text)
+                hours = NUMBER_PATTERN.search(time_text)
                 if hours:
-                    return (now - timedelta(hours=int(hours.group(1)))).isoformat()
+                    return (now - timedelta(hours=int(hours.group()))).isoformat()
             elif 'day' in time_text:
-                days = re.search(r'(\d+)', time_text)
+                days = NUMBER_PATTERN.search(time_text)
                 if days:
-                    return (now - timedelta(days=int(days.group(1)))).isoformat()
+                    return (now - timedelta(days=int(days.group()))).isoformat()
         
         return time_text
     
-    def _extract_content(self, element: Tag) -> Optional[str]:
+    def _extract_content(self, element: Tag, scan: PostScan) -> Optional[str]:
         """Extract post content"""
-        # Try common content selectors
-        content_selectors = [
-            '.content', '.message-content', '.post-content', '.body',
-            '[class*="content"]', '[class*="message"]', '[class*="body"]'
-        ]
-        
-        for selector in content_selectors:
-            content_element = element.select_one(selector)
-            if content_element:
-                # Remove quoted text and signatures
-                self._clean_content_element(content_element)
-                content = content_element.get_text().strip()
-                if content and len(content) > 10:
-                    return content
+        for content_element in scan.candidates('content'):
+            # Leave out quoted text and signatures
+            self._clean_content_element(content_element, scan)
+            content = scan.text(content_element).strip()
+            if content and len(content) > 10:
+                scan.accept('content', content_element)
+                return content
         
         # Fallback: use all text content
-        content = element.get_text().strip()
+        content = scan.text(element).strip()
         return content if len(content) > 10 else None
     
-    def _clean_content_element(self, element: Tag):
-        """Remove quotes, signatures, and other noise from content"""
-        # Remove quote blocks
-        for quote in element.find_all(class_=re.compile(r'quote|quoted')):
-            quote.decompose()
+    def _clean_content_element(self, element: Tag, scan: PostScan):
+        """Exclude quotes, signatures, and other noise from the content text
         
-        # Remove signatures
-        for sig in element.find_all(class_=re.compile(r'signature|sig')):
-            sig.decompose()
-        
-        # Remove edit notices
-        for edit in element.find_all(class_=re.compile(r'edit|modified')):
-            edit.decompose()
+        The tree itself is left intact, so the other fields see the whole post
+        whatever order they are extracted in.
+        """
+        scan.exclude(scan.noise_within(element))
     
-    def _extract_title(self, element: Tag) -> Optional[str]:
+    def _extract_title(self, scan: PostScan) -> Optional[str]:
         """Extract post or thread title"""
-        # Try common title selectors
-        title_selectors = [
-            '.title', '.subject', '.topic-title', 'h1', 'h2', 'h3',
-            '[class*="title"]', '[class*="subject"]'
-        ]
-        
-        for selector in title_selectors:
-            title_element = element.select_one(selector)
-            if title_element:
-                title = title_element.get_text().strip()
-                if title:
-                    return title
+        for title_element in scan.candidates('title'):
+            title = title_element.get_text().strip()
+            if title:
+                scan.accept('title', title_element)
+                return title
         
         return None
     
-    def _extract_replies_count(self, element: Tag) -> int:
+    def _extract_replies_count(self, scan: PostScan) -> int:
         """Extract number of replies"""
-        reply_selectors = [
-            '.replies', '.reply-count', '[class*="replies"]'
-        ]
-        
-        for selector in reply_selectors:
-            reply_element = element.select_one(selector)
-            if reply_element:
-                reply_text = reply_element.get_text()
-                numbers = re.findall(r'\d+', reply_text)
-                if numbers:
-                    return int(numbers[0])
+        for reply_element in scan.candidates('replies'):
+            reply_text = reply_element.get_text()
+            numbers = NUMBER_PATTERN.findall(reply_text)
+            if numbers:
+                scan.accept('replies', reply_element)
+                return int(numbers[0])
         
         return 0
     
-    def _extract_views_count(self, element: Tag) -> int:
+    def _extract_views_count(self, scan: PostScan) -> int:
         """Extract number of views"""
-        view_selectors = [
-            '.views', '.view-count', '[class*="views"]'
-        ]
-        
-        for selector in view_selectors:
-            view_element = element.select_one(selector)
-            if view_element:
-                view_text = view_element.get_text()
-                numbers = re.findall(r'\d+', view_text)
-                if numbers:
-                    return int(numbers[0])
+        for view_element in scan.candidates('views'):
+            view_text = view_element.get_text()
+            numbers = NUMBER_PATTERN.findall(view_text)
+            if numbers:
+                scan.accept('views', view_element)
+                return int(numbers[0])
         
         return 0
     
-    def _extract_tags(self, element: Tag) -> List[str]:
+    def _extract_tags(self, scan: PostScan) -> List[str]:
         """Extract tags or categories"""
         tags = []
         
-        tag_selectors = [
-            '.tag', '.category', '.label', '[class*="tag"]'
-        ]
-        
-        for selector in tag_selectors:
-            tag_elements = element.select(selector)
-            for tag_element in tag_elements:
+        for position in range(len(FIELD_SELECTORS['tags'])):
+            for tag_element in scan.all('tags', position):
                 tag_text = tag_element.get_text().strip()
                 if tag_text:
                     tags.append(tag_text)
         
         return tags
     
-    def _extract_links(self, element: Tag) -> List[Dict[str, str]]:
+    def _extract_links(self, scan: PostScan) -> List[Dict[str, str]]:
         """Extract links from post content"""
         links = []
         
-        for link in element.find_all('a', href=True):
+        for link in scan.links:
             href = link.get('href')
             text = link.get_text().strip()
             
@@ -356,69 +509,263 @@ class DataExtractor:
         else:
             return 'external'
     
-    def _analyze_content(self, content: str) -> Dict[str, Any]:
+    @property
+    def corpus_analysis(self) -> bool:
+        """Whether analyze_posts sets fields that depend on every post (TF-IDF keywords, sentiment)"""
+        return self.config.KEYWORD_SCORING == 'tfidf' or self.sentiment is not None
+    
+    def analyze_posts(self, posts: Iterable[Dict]) -> int:
+        """Run content analysis over extracted post records in place, returning how many were analyzed
+        
+        This is the analysis stage on its own, for posts extracted with
+        ANALYSIS_MODE = 'deferred' or analyzed with different patterns.
+        Records already analyzed with the current patterns are left as
+        they are. With KEYWORD_SCORING = 'tfidf', every post's keywords
+        are then ranked by TF-IDF over all the posts given, and with
+        ANALYZE_SENTIMENT every post is scored in one batch.
+        """
+        posts = [post_data for post_data in posts if post_data.get('content')]
+        fingerprint = self.patterns.fingerprint
+        analyzed = 0
+        for post_data in posts:
+            if post_data.get('analyzed_with') == fingerprint:
+                continue
+            post_data.update(self._cached_analysis(post_data))
+            analyzed += 1
+        
+        if self.config.KEYWORD_SCORING == 'tfidf' and posts:
+            engine, self.corpus_keywords = corpus_keywords(posts, window=self.config.KEYWORD_TIME_WINDOW)
+            for row, post_data in enumerate(posts):
+                post_data['keywords'] = engine.top_terms(row)
+        
+        if self.sentiment is not None and posts:
+            polarity, intensity = self.sentiment.score([post_text(post_data).words for post_data in posts])
+            for post_data, post_polarity, post_intensity in zip(posts, polarity.tolist(), intensity.tolist()):
+                post_data['sentiment_polarity'] = round(post_polarity, 4)
+                post_data['sentiment_intensity'] = round(post_intensity, 4)
+        return analyzed
+    
+    def _cached_analysis(self, post_data: Dict) -> Dict[str, Any]:
+        """Content analysis of a post, reused when the same content was analyzed before"""
+        content = post_data['content']
+        fingerprint = self.patterns.fingerprint
+        analysis = self.analysis_cache.get(content, fingerprint)
+        if analysis is None:
+            # Normalized once and kept on the record for the later stages
+            # (corpus keywords, sentiment, categorization); never saved
+            analysis = self._analyze_content(content, post_text(post_data))
+            # Records the patterns used, so the analysis stage can tell stale records
+            analysis['analyzed_with'] = fingerprint
+            self.analysis_cache.put(content, fingerprint, analysis)
+        return analysis
+    
+    def _analyze_content(self, content: str, text: PostText = None) -> Dict[str, Any]:
         """Analyze content for business intelligence"""
-        content_lower = content.lower()
+        text = text or normalize(content)
+        
+        # One scan finds the hits of every category
+        hits = self.patterns.matcher.scan(text.content, text.words)
+        emotions = hits.matched('emotional_indicators')
         
         analysis = {
-            'is_question': self._is_question(content_lower),
-            'is_answer': self._is_answer(content_lower),
-            'sentiment_indicators': self._extract_sentiment_indicators(content_lower),
-            'resource_mentions': self._extract_resource_mentions(content_lower),
-            'keywords': self._extract_keywords(content)
+            'is_question': bool(hits.matched('question_indicators')),
+            'is_answer': bool(hits.matched('answer_indicators')),
+            'sentiment_indicators': [pattern for pattern in self.patterns['emotional_indicators'] if pattern in emotions],
+            'resource_mentions': list(hits.mentions('resource_mentions')),
+            'keywords': self._extract_keywords(content, text)
         }
         
         return analysis
     
-    def _is_question(self, content: str) -> bool:
-        """Determine if content is a question"""
-        question_patterns = self.patterns['question_indicators']
-        return any(re.search(pattern, content, re.IGNORECASE) for pattern in question_patterns)
+    def _extract_keywords(self, content: str, text: PostText = None) -> List[str]:
+        """Extract important keywords from content"""
+        # Most frequent words of the post; with KEYWORD_SCORING = 'tfidf' the
+        # analysis stage replaces these with corpus TF-IDF keywords
+        text = text or normalize(content)
+        word_counts = Counter(keyword_terms(text.words))
+        return [word for word, count in word_counts.most_common(10)]
+
+# Extractor of a worker process, set up once by the pool initializer
+_worker_extractor: Optional[DataExtractor] = None
+
+def _init_extraction_worker(extractor_class: type, config: ScrapingConfig, selector_plan: Dict[str, Dict[str, Any]]):
+    """Create the worker's extractor, starting from the parent's learned plan"""
+    global _worker_extractor
+    _worker_extractor = extractor_class(config)
+    _worker_extractor.selector_plan = selector_plan
+
+def _extract_chunk(chunk: List[Tuple[bytes, str]]) -> Tuple[List[List[Dict]], Tuple[int, int]]:
+    """Extract a chunk of (html, section) pages in a worker process
     
-    def _is_answer(self, content: str) -> bool:
-        """Determine if content is an answer"""
-        answer_patterns = self.patterns['answer_indicators']
-        return any(re.search(pattern, content, re.IGNORECASE) for pattern in answer_patterns)
+    Returns the pages' posts, without private working fields so they
+    pickle small, with the worker's analysis cache hits and misses over
+    the chunk, so the parent can report them.
+    """
+    hits, misses = _worker_extractor.analysis_cache.counts()
+    results = [[public_record(post_data) for post_data in _worker_extractor.extract_page_data(html_content, section_name)]
+               for html_content, section_name in chunk]
+    after_hits, after_misses = _worker_extractor.analysis_cache.counts()
+    return results, (after_hits - hits, after_misses - misses)
+
+class PostStreamTarget:
+    """lxml parser target that builds soup trees for post containers only
     
-    def _extract_sentiment_indicators(self, content: str) -> List[str]:
-        """Extract emotional/sentiment indicators"""
-        indicators = []
-        emotion_patterns = self.patterns['emotional_indicators']
-        
-        for pattern in emotion_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                indicators.append(pattern)
-        
-        return indicators
+    Events outside a container are dropped without building anything.
+    Events inside one are forwarded to BeautifulSoup's own lxml tree
+    builder, so each completed container is the same tree the full-page
+    parse would have produced for it.
+    """
     
-    def _extract_resource_mentions(self, content: str) -> List[str]:
-        """Extract mentions of resources, products, services"""
-        mentions = []
-        resource_patterns = self.patterns['resource_mentions']
-        
-        for pattern in resource_patterns:
-            matches = re.finditer(rf'\b\w*{pattern}\w*\b', content, re.IGNORECASE)
-            for match in matches:
-                mentions.append(match.group())
-        
-        return list(set(mentions))  # Remove duplicates
+    def __init__(self, is_container: Callable[[str, Any], bool]):
+        self.is_container = is_container
+        self.completed: List[BeautifulSoup] = []
+        self._builder = None
+        self._depth = 0
     
-    def _extract_keywords(self, content: str) -> List[str]:
-        """Extract important keywords from content"""
-        # Simple keyword extraction - can be enhanced with NLP libraries
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', content.lower())
-        
-        # Filter out common stop words
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had',
-            'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his',
-            'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy',
-            'did', 'she', 'use', 'way', 'who', 'oil', 'sit', 'set', 'run', 'eat'
-        }
-        
-        keywords = [word for word in words if word not in stop_words and len(word) > 3]
-        
-        # Return most frequent keywords
-        from collections import Counter
-        word_counts = Counter(keywords)
-        return [word for word, count in word_counts.most_common(10)]
\ No newline at end of file
+    def start(self, tag, attrib):
+        if not self._depth:
+            if not self.is_container(tag, attrib.get('class')):
+                return
+            soup = BeautifulSoup('', 'lxml')
+            self._builder = soup.builder
+            self._builder.soup = soup  # The constructor detaches it after its own parse
+            soup.reset()
+        self._depth += 1
+        self._builder.start(tag, attrib)
+    
+    def end(self, tag):
+        if not self._depth:
+            return
+        self._builder.end(tag)
+        self._depth -= 1
+        if not self._depth:
+            soup = self._builder.soup
+            soup.endData()
+            while soup.currentTag.name != soup.ROOT_TAG_NAME:
+                soup.popTag()
+            self.completed.append(soup)
+            self._builder = None
+    
+    def data(self, content):
+        if self._depth:
+            self._builder.data(content)
+    
+    def comment(self, content):
+        if self._depth:
+            self._builder.comment(content)
+    
+    def pi(self, target, data):
+        if self._depth:
+            self._builder.pi(target, data)
+    
+    def close(self):
+        return self.completed
+
+class StreamingDataExtractor(DataExtractor):
+    """Extracts posts from an event-driven lxml parse with bounded memory
+    
+    Post containers are recognized by the section's learned post selector
+    while the page is parsed chunk by chunk. Only container subtrees are
+    built, and each is extracted and dropped as soon as its end tag is
+    seen, so memory tracks the largest post rather than the page. Records
+    match DataExtractor.extract_page_data with the lxml backend.
+    """
+    
+    # Bytes buffered before the declared charset is sniffed
+    ENCODING_SNIFF_BYTES = 2048
+    
+    def extract_page_data(self, html_content: bytes, section_name: str) -> List[Dict]:
+        """Extract structured data from a forum page"""
+        try:
+            posts_data = list(self.iter_page_data([html_content], section_name))
+        except UnicodeDecodeError as e:
+            self.logger.warning(f"Streaming parse of a {section_name} page failed, parsing it in full: {e}")
+            posts_data = []
+        if not posts_data:
+            # Nothing matched the learned selector: rediscover posts on the full tree
+            posts_data = super().extract_page_data(html_content, section_name)
+        return posts_data
+    
+    def iter_page_data(self, chunks: Iterable[bytes], section_name: str,
+                       encoding: str = None) -> Iterator[Dict]:
+        """Yield post records while a page is parsed from a stream of byte chunks
+        
+        The encoding is detected on the first ENCODING_SNIFF_BYTES; bytes
+        further on that do not decode in it raise UnicodeDecodeError.
+        """
+        selector = self.selector_plan.get(section_name, {}).get('post_selector')
+        if not selector or self.parser_backend != 'lxml' or etree is None:
+            # Without a learned selector the cascade needs the whole document
+            yield from super().extract_page_data(b''.join(chunks), section_name)
+            return
+        
+        target = PostStreamTarget(element_matcher(selector))
+        parser = None
+        pending = b''
+        
+        for chunk in chunks:
+            pending += chunk
+            if parser is None:
+                # Sniff the declared charset the way BeautifulSoup does before parsing
+                if len(pending) < self.ENCODING_SNIFF_BYTES:
+                    continue
+                parser = self._stream_parser(target, pending, encoding)
+            
+            # libxml2's HTML push parser stops emitting events until close() when a
+            # chunk ends inside a quoted attribute, so feed only up to a tag end
+            cut = pending.rfind(b'>') + 1
+            if cut:
+                parser.feed(pending[:cut])
+                pending = pending[cut:]
+                yield from self._drain(target, selector, section_name)
+        
+        if parser is None:
+            if not pending:
+                return
+            parser = self._stream_parser(target, pending, encoding)
+        if pending:
+            parser.feed(pending)
+        
+        # Closing flushes the end events of implicitly closed tags
+        parser.close()
+        yield from self._drain(target, selector, section_name)
+        self._update_field_template(section_name)
+    
+    def _stream_parser(self, target: PostStreamTarget, head: bytes, encoding: str = None):
+        """HTML parser feeding `target`, configured like BeautifulSoup's lxml builder"""
+        encoding = encoding or self._sniff_encoding(head)
+        return etree.HTMLParser(target=target, strip_cdata=False, recover=True, encoding=encoding)
+    
+    @staticmethod
+    def _sniff_encoding(head: bytes) -> str:
+        """First encoding the page head decodes in, tried in UnicodeDammit's order
+        
+        That is a byte order mark, the declared charset, then utf-8 and
+        windows-1252, so undeclared legacy pages decode as they do for
+        BeautifulSoup.
+        """
+        for encoding in EncodingDetector(head, is_html=True).encodings:
+            try:
+                # Incremental, so a multi-byte character cut off at the end is not an error
+                codecs.getincrementaldecoder(encoding)().decode(head)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            return encoding
+        return 'windows-1252'
+    
+    def _drain(self, target: PostStreamTarget, selector: str, section_name: str) -> Iterator[Dict]:
+        """Extract and release every container completed so far"""
+        while target.completed:
+            soup = target.completed.pop(0)
+            
+            # Nested containers are posts too, processed in document order as on the full tree
+            for post in soup.select(selector):
+                try:
+                    post_data = self._extract_post_data(post, section_name)
+                    if post_data:
+                        yield post_data
+                except Exception as e:
+                    self.logger.warning(f"Error extracting post data: {e}")
+            
+            # Break the tree's reference cycles so the subtree is freed right away
+            soup.decompose()
@@ -0,0 +1,118 @@
+"""
+Per-section field templates: DOM paths to post fields learned from the first pages
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from bs4 import Tag
+
+# Fields that resolve to a single element, and so can be given a learned path
+TEMPLATE_FIELDS = ['author', 'timestamp', 'content', 'title', 'replies', 'views']
+
+# One step down the tree: (tag name, first class or '', ordinal among matching siblings)
+Step = Tuple[str, str, int]
+
+def _first_class(tag: Tag) -> str:
+    """First class token of a tag, or '' when it has none"""
+    classes = tag.attrs.get('class')
+    if not classes:
+        return ''
+    if isinstance(classes, str):
+        classes = classes.split()
+    return classes[0] if classes else ''
+
+def element_path(element: Tag, root: Tag) -> Optional[Tuple[Step, ...]]:
+    """Child steps leading from root down to element, or None if it is not below root"""
+    steps = []
+    while element is not root:
+        parent = element.parent
+        if parent is None:
+            return None
+        key = (element.name, _first_class(element))
+        ordinal = sum(1 for sibling in element.previous_siblings
+                      if isinstance(sibling, Tag) and (sibling.name, _first_class(sibling)) == key)
+        steps.append((key[0], key[1], ordinal))
+        element = parent
+    return tuple(reversed(steps))
+
+class FieldPath:
+    """A learned path from a post container to one field element
+
+    Locating an element only visits the children along the path, instead
+    of matching every descendant against the field's selector cascade.
+    """
+
+    def __init__(self, steps):
+        self.steps: Tuple[Step, ...] = tuple((name, class_name, ordinal) for name, class_name, ordinal in steps)
+
+    def locate(self, root: Tag) -> Optional[Tag]:
+        """Follow the path from root, returning None where the page no longer has it"""
+        element = root
+        for name, class_name, ordinal in self.steps:
+            seen = 0
+            for child in element.children:
+                if isinstance(child, Tag) and child.name == name and _first_class(child) == class_name:
+                    if seen == ordinal:
+                        element = child
+                        break
+                    seen += 1
+            else:
+                return None
+        return element
+
+    def to_json(self) -> List[list]:
+        return [list(step) for step in self.steps]
+
+    def __repr__(self) -> str:
+        return '/'.join(f"{name}.{class_name}[{ordinal}]" if class_name else f"{name}[{ordinal}]"
+                        for name, class_name, ordinal in self.steps)
+
+class SectionTemplate:
+    """Field paths of one forum section, learned from observed posts
+
+    While learning, the path of the element each field was resolved to is
+    counted per post. A field gets a template when one path covers enough
+    of the posts that had the field. Once in use, hits and misses are
+    counted so the section can be re-learned when the layout changes.
+    """
+
+    def __init__(self, paths: Dict[str, list] = None):
+        self.paths: Dict[str, FieldPath] = {field: FieldPath(steps) for field, steps in (paths or {}).items()}
+        self.reset_stats()
+        self.observations: Dict[str, Counter] = {}
+        self.pages_observed = 0
+
+    @property
+    def learning(self) -> bool:
+        return not self.paths
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def observe(self, field: str, path: Tuple[Step, ...]):
+        """Count the path a field was resolved to on one post"""
+        self.observations.setdefault(field, Counter())[path] += 1
+
+    def record(self, field: str, hit: bool):
+        """Count whether a field's learned path gave the value"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def hit_rate(self) -> Optional[float]:
+        """Share of resolved fields that came from their learned path"""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def compile(self, min_support: float) -> bool:
+        """Turn the observations into field paths, returning whether any was stable"""
+        for field, counts in self.observations.items():
+            path, count = counts.most_common(1)[0]
+            if count / sum(counts.values()) >= min_support:
+                self.paths[field] = FieldPath(path)
+        self.observations = {}
+        return bool(self.paths)
+
+    def to_json(self) -> Dict[str, List[list]]:
+        return {field: path.to_json() for field, path in self.paths.items()}
@@ -0,0 +1,162 @@
+"""
+Corpus-level TF-IDF keywords over a sparse document-term matrix
+"""
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tokenization import keyword_tokens, post_text
+
+# Common words never reported as keywords
+STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had',
+    'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his',
+    'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy',
+    'did', 'she', 'use', 'way', 'oil', 'sit', 'set', 'run', 'eat'
+})
+
+# Shortest word kept as a keyword
+MIN_KEYWORD_LENGTH = 4
+
+# Length of a timestamp prefix naming each time window
+TIME_WINDOWS = {'year': 4, 'month': 7, 'day': 10}
+
+def keyword_terms(words: Iterable[str]) -> List[str]:
+    """Keyword candidates among a post's tokens: long enough ASCII words that are not stop words"""
+    return [word for word in keyword_tokens(words) if len(word) >= MIN_KEYWORD_LENGTH and word not in STOP_WORDS]
+
+def time_window(timestamp: Optional[str], window: str = 'month') -> Optional[str]:
+    """Label of the time window an ISO timestamp falls in, e.g. '2024-01' for a month
+
+    Timestamps kept as page text ('Mon Jan 01, 2024', 'yesterday at 5pm')
+    are not bucketed.
+    """
+    try:
+        datetime.strptime(timestamp[:10], '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+    return timestamp[:TIME_WINDOWS[window]]
+
+class KeywordEngine:
+    """TF-IDF weights of keyword terms across a corpus of posts
+
+    Documents are added one at a time as token sequences; each term gets
+    an integer id from one shared vocabulary. Token ids are buffered in a
+    flat array and turned into compressed sparse rows (indptr, indices,
+    counts) in blocks, so no per-document dict is kept and memory grows
+    with the number of distinct (document, term) pairs. `finalize`
+    computes smoothed IDF, `1 + log((1 + n) / (1 + df))`, and
+    L2-normalized TF-IDF weights row by row.
+    """
+
+    def __init__(self, flush_tokens: int = 1 << 22):
+        self.vocabulary: Dict[str, int] = {}
+        self.flush_tokens = flush_tokens
+        self._tokens = array('i')
+        self._lengths = array('q')
+        self._blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.documents = 0
+
+        # Set by finalize
+        self.terms: Optional[np.ndarray] = None
+        self.indptr: Optional[np.ndarray] = None
+        self.indices: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        self.idf: Optional[np.ndarray] = None
+
+    def add(self, words: Iterable[str]) -> int:
+        """Add a document given its tokens, returning its row number"""
+        vocabulary = self.vocabulary
+        terms = keyword_terms(words)
+        self._tokens.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+        self._lengths.append(len(terms))
+        self.documents += 1
+        if len(self._tokens) >= self.flush_tokens:
+            self._flush()
+        return self.documents - 1
+
+    def _flush(self):
+        """Turn the buffered documents into a block of sparse rows"""
+        if not self._lengths:
+            return
+        tokens = np.frombuffer(self._tokens, dtype=np.int32).astype(np.int64)
+        lengths = np.frombuffer(self._lengths, dtype=np.int64)
+        vocabulary_size = max(len(self.vocabulary), 1)
+
+        # One sort counts every (document, term) pair of the block
+        rows = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        pairs, counts = np.unique(rows * vocabulary_size + tokens, return_counts=True)
+        row_lengths = np.bincount(pairs // vocabulary_size, minlength=len(lengths))
+        self._blocks.append((row_lengths, (pairs % vocabulary_size).astype(np.int32), counts.astype(np.int32)))
+
+        self._tokens = array('i')
+        self._lengths = array('q')
+
+    def finalize(self) -> 'KeywordEngine':
+        """Compute TF-IDF weights of everything added so far"""
+        self._flush()
+        row_lengths = np.concatenate([block[0] for block in self._blocks] or [np.zeros(0, dtype=np.int64)])
+        self.indptr = np.concatenate(([0], np.cumsum(row_lengths))).astype(np.int64)
+        self.indices = np.concatenate([block[1] for block in self._blocks] or [np.zeros(0, dtype=np.int32)])
+        counts = np.concatenate([block[2] for block in self._blocks] or [np.zeros(0, dtype=np.int32)])
+        self._blocks = [(row_lengths, self.indices, counts)]
+        self.terms = np.array(list(self.vocabulary), dtype=object)
+
+        document_frequency = np.bincount(self.indices, minlength=len(self.vocabulary))
+        self.idf = 1.0 + np.log((1.0 + self.documents) / (1.0 + document_frequency))
+
+        weights = counts * self.idf[self.indices]
+        rows = self._row_numbers()
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=self.documents))
+        self.weights = weights / norms[rows] if len(weights) else weights
+        return self
+
+    def _row_numbers(self) -> np.ndarray:
+        """Row number of every stored entry"""
+        return np.repeat(np.arange(self.documents, dtype=np.int64), np.diff(self.indptr))
+
+    def top_terms(self, document: int, count: int = 10) -> List[str]:
+        """Highest weighted terms of one document"""
+        start, end = self.indptr[document], self.indptr[document + 1]
+        return self._ranked(self.indices[start:end], self.weights[start:end], count)
+
+    def top_terms_by(self, labels: Sequence, count: int = 10) -> Dict[str, List[str]]:
+        """Highest weighted terms of each group of documents, summing their rows
+
+        `labels` gives each document's group, such as its section or time
+        window; documents labelled None are left out.
+        """
+        labels = np.array([label if label is not None else '' for label in labels], dtype=object)
+        names, groups = np.unique(labels, return_inverse=True)
+        entry_groups = groups[self._row_numbers()]
+
+        vocabulary_size = max(len(self.vocabulary), 1)
+        pairs, inverse = np.unique(entry_groups * vocabulary_size + self.indices, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=self.weights)
+        pair_groups = pairs // vocabulary_size
+        bounds = np.searchsorted(pair_groups, np.arange(len(names) + 1))
+
+        return {
+            name: self._ranked(pairs[bounds[group]:bounds[group + 1]] % vocabulary_size,
+                               sums[bounds[group]:bounds[group + 1]], count)
+            for group, name in enumerate(names) if name != ''
+        }
+
+    def _ranked(self, term_ids: np.ndarray, weights: np.ndarray, count: int) -> List[str]:
+        """Terms by decreasing weight, ties in vocabulary order"""
+        order = np.lexsort((term_ids, -weights))[:count]
+        return self.terms[term_ids[order]].tolist()
+
+def corpus_keywords(posts: List[Dict], count: int = 10,
+                    window: str = 'month') -> Tuple[KeywordEngine, Dict[str, Dict[str, List[str]]]]:
+    """TF-IDF engine with one row per post, and the top terms per section and per time window"""
+    engine = KeywordEngine()
+    for post in posts:
+        engine.add(post_text(post).words)
+    engine.finalize()
+    return engine, {
+        'by_section': engine.top_terms_by([post.get('section') for post in posts], count),
+        f'by_{window}': engine.top_terms_by([time_window(post.get('timestamp'), window) for post in posts], count)
+    }
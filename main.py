@@ -3,12 +3,17 @@ Main application for Imamother Forum Scraper
 """
 import os
 import sys
+import logging
+import sqlite3
 import argparse
+from collections import deque
 from datetime import datetime
 from typing import Dict, List
 
 from scraper import ImamotherScraper
 from config import ScrapingConfig
+from page_archive import PageArchive, INDEX_FILE
+from storage import load_posts, is_data_file
 from utils import (
     setup_logging, generate_summary_stats, validate_scraped_data,
     backup_data, create_robots_txt_checker
@@ -31,6 +36,13 @@ def main():
                        help='Create backup of existing data before scraping')
     parser.add_argument('--validate-only', action='store_true',
                        help='Only validate existing scraped data')
+    parser.add_argument('--reextract', metavar='ARCHIVE',
+                       help='Re-run extraction over an archived page directory instead of scraping')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --reextract (default: one per CPU)')
+    parser.add_argument('--analyze', metavar='DATA_FILE',
+                       help='Run content analysis over saved posts (a .json or .jsonl file, optionally '
+                            'compressed, a .parquet file or a .db post store) instead of scraping')
     
     args = parser.parse_args()
     
@@ -38,6 +50,16 @@ def main():
     logger = setup_logging(ScrapingConfig.LOG_LEVEL, ScrapingConfig.LOG_FILE)
     logger.info("Starting Imamother Forum Scraper")
     
+    # Re-extraction works from archived pages only: no credentials or network needed
+    if args.reextract:
+        reextract_archive(args.reextract, args.sections, args.output_dir, args.workers)
+        return
+    
+    # So does the analysis stage, over posts saved by an earlier run
+    if args.analyze:
+        analyze_saved_data(args.analyze, args.sections, args.output_dir)
+        return
+    
     # Validate configuration
     if not ScrapingConfig.validate_config():
         logger.error("Configuration validation failed")
@@ -56,6 +78,7 @@ def main():
         backup_data(args.output_dir)
     
     # Initialize scraper
+    scraper = None
     try:
         with ImamotherScraper() as scraper:
             # Test login
@@ -100,40 +123,116 @@ def main():
             
             # Save scraped data
             if all_scraped_data:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                scraper.save_data(all_scraped_data, f"imamother_scrape_{timestamp}")
-                
-                # Generate and save summary statistics
-                stats = generate_summary_stats(all_scraped_data)
-                stats_file = os.path.join(args.output_dir, f"summary_stats_{timestamp}.json")
-                
-                import json
-                with open(stats_file, 'w', encoding='utf-8') as f:
-                    json.dump(stats, f, indent=2, default=str)
-                
-                logger.info(f"Summary statistics saved to: {stats_file}")
-                
-                # Validate scraped data
-                validation_results = validate_scraped_data(all_scraped_data)
-                if validation_results['valid']:
-                    logger.info("Data validation passed")
-                else:
-                    logger.warning("Data validation issues found:")
-                    for issue in validation_results['issues']:
-                        logger.warning(f"  - {issue}")
-                
-                # Print summary
-                print_scraping_summary(all_scraped_data, stats)
-                
+                finish_inline_analysis(scraper, all_scraped_data)
+                save_and_report(scraper, all_scraped_data, args.output_dir, "imamother_scrape")
             else:
                 logger.warning("No data was scraped")
     
     except KeyboardInterrupt:
         logger.info("Scraping interrupted by user")
+        if scraper and scraper.post_sink and scraper.post_sink.records_written:
+            logger.info(f"{scraper.post_sink.records_written} posts scraped so far are in {scraper.post_sink.path}")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise
 
+def save_and_report(scraper: ImamotherScraper, all_scraped_data: Dict[str, List[Dict]],
+                    output_dir: str, prefix: str):
+    """Save extracted data with its summary statistics, validate it and print a summary"""
+    logger = logging.getLogger(__name__)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    scraper.save_data(all_scraped_data, f"{prefix}_{timestamp}")
+    
+    # Generate and save summary statistics
+    stats = generate_summary_stats(all_scraped_data)
+    stats['analysis_cache'] = scraper.data_extractor.analysis_cache.stats()
+    if scraper.data_extractor.corpus_keywords:
+        stats['corpus_keywords'] = scraper.data_extractor.corpus_keywords
+    stats_file = os.path.join(output_dir, f"summary_stats_{timestamp}.json")
+    
+    import json
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, default=str)
+    
+    logger.info(f"Summary statistics saved to: {stats_file}")
+    
+    # Validate scraped data
+    validation_results = validate_scraped_data(all_scraped_data)
+    if validation_results['valid']:
+        logger.info("Data validation passed")
+    else:
+        logger.warning("Data validation issues found:")
+        for issue in validation_results['issues']:
+            logger.warning(f"  - {issue}")
+    
+    # Print summary
+    print_scraping_summary(all_scraped_data, stats)
+
+def finish_inline_analysis(scraper: ImamotherScraper, all_scraped_data: Dict[str, List[Dict]]):
+    """Run the corpus-wide analysis steps once every post has been extracted and analyzed"""
+    if scraper.config.ANALYSIS_MODE == 'inline' and scraper.data_extractor.corpus_analysis:
+        # Posts are already analyzed, so only corpus steps such as TF-IDF keywords run
+        scraper.data_extractor.analyze_posts(post for posts in all_scraped_data.values() for post in posts)
+
+def reextract_archive(archive_dir: str, sections: List[str], output_dir: str, workers: int = None):
+    """Run the current extractor over archived pages and save the results"""
+    logger = logging.getLogger(__name__)
+    
+    if not os.path.exists(os.path.join(archive_dir, INDEX_FILE)):
+        logger.error(f"No page archive index found in {archive_dir}")
+        sys.exit(1)
+    archive = PageArchive(archive_dir)
+    
+    # The scraper is only used for its extractor and output; it never logs in
+    with ImamotherScraper() as scraper:
+        extractor = scraper.data_extractor
+        all_data: Dict[str, List[Dict]] = {}
+        archived = deque()
+        
+        def pages():
+            for entry, content in archive.iter_pages(sections, latest=True):
+                archived.append(entry)
+                yield content, entry['section']
+        
+        for page_data in extractor.extract_many(pages(), workers=workers):
+            entry = archived.popleft()
+            all_data.setdefault(entry['section'], []).extend(page_data)
+        
+        logger.info(f"Re-extracted {sum(len(posts) for posts in all_data.values())} posts "
+                    f"from {archive_dir}")
+        
+        if all_data:
+            finish_inline_analysis(scraper, all_data)
+            save_and_report(scraper, all_data, output_dir, "imamother_reextract")
+        else:
+            logger.warning("No data was extracted from the archive")
+
+def analyze_saved_data(data_file: str, sections: List[str], output_dir: str):
+    """Run the content analysis stage over saved posts and save the analyzed data"""
+    logger = logging.getLogger(__name__)
+    
+    try:
+        data = load_posts(data_file)
+    except (OSError, ValueError, sqlite3.DatabaseError, ImportError) as e:
+        # ValueError covers malformed JSON and Parquet, ImportError a missing pyarrow
+        logger.error(f"Error loading data file {data_file}: {e}")
+        sys.exit(1)
+    
+    if sections:
+        data = {section: posts for section, posts in data.items() if section in sections}
+    
+    with ImamotherScraper() as scraper:
+        analyzed = scraper.data_extractor.analyze_posts(post for posts in data.values() for post in posts)
+        total = sum(len(posts) for posts in data.values())
+        logger.info(f"Analyzed {analyzed} of {total} posts from {data_file} "
+                    f"({total - analyzed} already analyzed with the current patterns)")
+        
+        if data:
+            save_and_report(scraper, data, output_dir, "imamother_analyzed")
+        else:
+            logger.warning("No posts to analyze")
+
 def validate_existing_data(output_dir: str):
     """Validate existing scraped data"""
     logger = setup_logging()
@@ -142,8 +241,8 @@ def validate_existing_data(output_dir: str):
         logger.error(f"Output directory does not exist: {output_dir}")
         return
     
-    # Find JSON data files
-    json_files = [f for f in os.listdir(output_dir) if f.endswith('.json') and 'imamother_scrape' in f]
+    # Find JSON and JSON Lines data files
+    json_files = [f for f in os.listdir(output_dir) if is_data_file(f) and 'imamother_scrape' in f]
     
     if not json_files:
         logger.error("No scraped data files found")
@@ -156,9 +255,7 @@ def validate_existing_data(output_dir: str):
     logger.info(f"Validating data file: {latest_file}")
     
     try:
-        import json
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_posts(file_path)
         
         validation_results = validate_scraped_data(data)
         
@@ -205,6 +302,18 @@ def print_scraping_summary(data: Dict[str, List], stats: Dict):
     print(f"  Answers identified: {content_stats['answers']}")
     print(f"  Resource mentions: {content_stats['resource_mentions']}")
     
+    cache_stats = stats.get('analysis_cache')
+    if cache_stats and cache_stats['hits'] + cache_stats['misses']:
+        print(f"  Analysis cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate)")
+    
+    sentiment_stats = stats.get('sentiment', {})
+    if sentiment_stats.get('scored_posts'):
+        print(f"\nSentiment:")
+        print(f"  Average polarity: {sentiment_stats['avg_polarity']:+.2f}")
+        print(f"  Positive / negative / neutral posts: {sentiment_stats['positive']} / "
+              f"{sentiment_stats['negative']} / {sentiment_stats['neutral']}")
+    
     print(f"\nBusiness Opportunities:")
     biz_stats = stats['business_opportunities']
     for category, count in biz_stats.items():
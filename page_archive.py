@@ -0,0 +1,133 @@
+"""
+Append-only archive of fetched forum pages, for re-extraction without refetching
+"""
+import os
+import json
+import gzip
+import uuid
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Iterator, Tuple
+
+INDEX_FILE = "index.jsonl"
+
+class PageArchive:
+    """Compressed WARC-style page records with a sidecar offset index
+
+    Each page is written as a WARC 'resource' record compressed as its own
+    gzip member, so a record can be read back by seeking to its offset
+    and the archive files stay readable by standard WARC tools. Every
+    record is also appended to index.jsonl as url, section, file, offset,
+    length and fetched_at. A run writes a new archive file; nothing is
+    ever rewritten.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.logger = logging.getLogger(__name__)
+        self._archive_file = None
+        self._archive_name = None
+        self._urls: Optional[Dict[str, Dict]] = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, url: str, section: str, content: bytes, fetched_at: str = None) -> Dict:
+        """Archive one fetched page and return its index entry"""
+        fetched_at = fetched_at or datetime.now().isoformat()
+        if self._archive_file is None:
+            self._archive_name = f"pages_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.warc.gz"
+            self._archive_file = open(os.path.join(self.directory, self._archive_name), 'ab')
+
+        headers = [
+            "WARC/1.1",
+            "WARC-Type: resource",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {fetched_at}",
+            f"WARC-Target-URI: {url}",
+            f"X-Section: {section}",
+            "Content-Type: text/html",
+            f"Content-Length: {len(content)}"
+        ]
+        record = ('\r\n'.join(headers) + '\r\n\r\n').encode('utf-8') + content + b'\r\n\r\n'
+        compressed = gzip.compress(record)
+
+        offset = self._archive_file.tell()
+        self._archive_file.write(compressed)
+        self._archive_file.flush()
+
+        entry = {
+            'url': url,
+            'section': section,
+            'file': self._archive_name,
+            'offset': offset,
+            'length': len(compressed),
+            'fetched_at': fetched_at
+        }
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        if self._urls is not None:
+            self._urls[url] = entry
+        return entry
+
+    def entries(self, sections: List[str] = None) -> Iterator[Dict]:
+        """Index entries in the order pages were archived"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping malformed index line in {self.index_path}")
+                    continue
+                if sections is None or entry['section'] in sections:
+                    yield entry
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Latest index entry archived for a URL"""
+        if self._urls is None:
+            self._urls = {entry['url']: entry for entry in self.entries()}
+        return self._urls.get(url)
+
+    def read(self, entry: Dict) -> bytes:
+        """Page content of an index entry, read from its offset"""
+        with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+            f.seek(entry['offset'])
+            record = gzip.decompress(f.read(entry['length']))
+
+        head, _, block = record.partition(b'\r\n\r\n')
+        for line in head.split(b'\r\n'):
+            name, _, value = line.partition(b':')
+            if name.lower() == b'content-length':
+                return block[:int(value)]
+        return block[:-4]
+
+    def iter_pages(self, sections: List[str] = None, latest: bool = False) -> Iterator[Tuple[Dict, bytes]]:
+        """Archived (index entry, page content) pairs in archive order
+
+        With `latest`, a URL archived more than once is only read at its most
+        recent fetch.
+        """
+        entries = self.entries(sections)
+        if latest:
+            newest = {entry['url']: entry for entry in self.entries(sections)}
+            entries = (entry for entry in entries if newest[entry['url']] == entry)
+        for entry in entries:
+            try:
+                yield entry, self.read(entry)
+            except (OSError, EOFError, ValueError) as e:
+                self.logger.warning(f"Error reading archived page {entry.get('url')}: {e}")
+
+    def close(self):
+        if self._archive_file is not None:
+            self._archive_file.close()
+            self._archive_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
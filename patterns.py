@@ -0,0 +1,101 @@
+"""
+Compiled regular expression registry for extraction and content analysis
+"""
+import re
+import json
+import hashlib
+from typing import Dict, List, Pattern, Tuple
+
+from content_matcher import CategoryMatcher
+
+# Structural patterns, compiled once at import
+POST_ID_PATTERN = re.compile(r'post|message')
+NOISE_CLASS_PATTERN = re.compile(r'quote|quoted|signature|sig|edit|modified')
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Class patterns of descendants that suggest an element is a post
+POST_MARKER_PATTERNS = {
+    'author': re.compile(r'author|user|poster'),
+    'date': re.compile(r'date|time|timestamp'),
+    'content': re.compile(r'content|body|message')
+}
+
+# Content indicator patterns, extended per run through ScrapingConfig.CUSTOM_PATTERNS
+DEFAULT_CONTENT_PATTERNS = {
+    'question_indicators': [
+        r'\?', r'how to', r'what is', r'where can', r'when should',
+        r'why does', r'help', r'advice', r'suggestions', r'recommendations'
+    ],
+    'answer_indicators': [
+        r'try this', r'i suggest', r'in my experience', r'you should',
+        r'i recommend', r'what worked for me', r'here\'s what'
+    ],
+    'resource_mentions': [
+        r'book', r'website', r'article', r'doctor', r'specialist',
+        r'product', r'service', r'app', r'tool', r'resource'
+    ],
+    'emotional_indicators': [
+        r'worried', r'scared', r'excited', r'frustrated', r'happy',
+        r'sad', r'anxious', r'grateful', r'confused', r'hopeful'
+    ]
+}
+
+# Groups whose patterns match the whole word around the pattern
+WORD_GROUPS = {'resource_mentions'}
+
+class PatternRegistry:
+    """Content indicator patterns, each compiled exactly once
+
+    Indexing by group name returns the raw pattern strings, so callers
+    that report which pattern matched keep reporting the same strings.
+    """
+
+    def __init__(self, custom_patterns: Dict[str, List[str]] = None):
+        self.raw: Dict[str, List[str]] = {}
+        self.compiled: Dict[str, List[Tuple[str, Pattern]]] = {}
+        self._matcher = None
+        self._fingerprint = None
+
+        for group, patterns in DEFAULT_CONTENT_PATTERNS.items():
+            for pattern in patterns:
+                self.register(group, pattern)
+
+        for group, patterns in (custom_patterns or {}).items():
+            for pattern in patterns:
+                self.register(group, pattern)
+
+    def register(self, group: str, pattern: str):
+        """Add a pattern to a group and compile it"""
+        if pattern in self.raw.get(group, []):
+            return
+
+        source = rf'\b\w*{pattern}\w*\b' if group in WORD_GROUPS else pattern
+        self.raw.setdefault(group, []).append(pattern)
+        self.compiled.setdefault(group, []).append((pattern, re.compile(source, re.IGNORECASE)))
+        self._matcher = None
+        self._fingerprint = None
+
+    def __getitem__(self, group: str) -> List[str]:
+        return self.raw[group]
+
+    def __contains__(self, group: str) -> bool:
+        return group in self.raw
+
+    @property
+    def matcher(self) -> CategoryMatcher:
+        """Single-pass matcher over all groups, rebuilt after patterns change"""
+        if self._matcher is None:
+            self._matcher = CategoryMatcher(self.compiled, WORD_GROUPS)
+        return self._matcher
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of every group's patterns, changing whenever a pattern is added"""
+        if self._fingerprint is None:
+            encoded = json.dumps(self.raw, sort_keys=True).encode('utf-8')
+            self._fingerprint = hashlib.sha1(encoded).hexdigest()
+        return self._fingerprint
+
+    def group(self, group: str) -> List[Tuple[str, Pattern]]:
+        """(raw pattern, compiled pattern) pairs of a group, in order"""
+        return self.compiled.get(group, [])
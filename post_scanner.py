@@ -0,0 +1,363 @@
+"""
+Single-traversal field scanner for forum post elements
+"""
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, NamedTuple, Pattern
+from bs4 import SoupStrainer, Tag, NavigableString
+
+from patterns import POST_ID_PATTERN, NOISE_CLASS_PATTERN
+
+# Candidate selectors for each post field, in priority order
+FIELD_SELECTORS = {
+    'author': [
+        '.author', '.username', '.poster', '.user-name',
+        '[class*="author"]', '[class*="user"]', '[class*="poster"]'
+    ],
+    'timestamp': [
+        '.timestamp', '.date', '.time', '.posted-date',
+        '[class*="time"]', '[class*="date"]', 'time'
+    ],
+    'content': [
+        '.content', '.message-content', '.post-content', '.body',
+        '[class*="content"]', '[class*="message"]', '[class*="body"]'
+    ],
+    'title': [
+        '.title', '.subject', '.topic-title', 'h1', 'h2', 'h3',
+        '[class*="title"]', '[class*="subject"]'
+    ],
+    'replies': [
+        '.replies', '.reply-count', '[class*="replies"]'
+    ],
+    'views': [
+        '.views', '.view-count', '[class*="views"]'
+    ],
+    'tags': [
+        '.tag', '.category', '.label', '[class*="tag"]'
+    ]
+}
+
+_CLASS_SELECTOR = re.compile(r'^\.([\w-]+)$')
+_CLASS_SUBSTRING_SELECTOR = re.compile(r'^\[class\*="([^"]+)"\]$')
+_NAME_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)$')
+
+def compile_selector(selector: str) -> tuple:
+    """Compile a simple CSS selector into a (kind, value) matcher
+
+    Only the selector forms used by the extractor are supported: a class
+    (`.name`), a class substring (`[class*="name"]`) and a tag name.
+    """
+    for kind, pattern in (('class', _CLASS_SELECTOR),
+                          ('class_substring', _CLASS_SUBSTRING_SELECTOR),
+                          ('name', _NAME_SELECTOR)):
+        match = pattern.match(selector)
+        if match:
+            value = match.group(1)
+            return kind, value.lower() if kind == 'name' else value
+    raise ValueError(f"Unsupported selector for single-pass scanning: {selector}")
+
+def _class_list(value) -> List[str]:
+    """Class tokens of an attribute value, whether or not it is split yet"""
+    if not value:
+        return []
+    return value.split() if isinstance(value, str) else value
+
+def class_strainer(classes: List[str], substring: bool = False, name=None) -> SoupStrainer:
+    """SoupStrainer keeping elements that have one of `classes`
+
+    While parsing, the class attribute is still a single string, so it is
+    split here rather than compared whole as SoupStrainer would.
+    """
+    if substring:
+        def matches(value):
+            text = ' '.join(_class_list(value))
+            return any(class_name in text for class_name in classes)
+    else:
+        def matches(value):
+            return any(class_name in classes for class_name in _class_list(value))
+    return SoupStrainer(name, class_=matches)
+
+def element_matcher(selector: str) -> Callable[[str, Any], bool]:
+    """Predicate on (tag name, class attribute) for a simple selector"""
+    kind, value = compile_selector(selector)
+    if kind == 'class':
+        return lambda name, classes: value in _class_list(classes)
+    if kind == 'class_substring':
+        return lambda name, classes: value in ' '.join(_class_list(classes))
+    return lambda name, classes: name.lower() == value
+
+def selector_strainer(selector: str) -> SoupStrainer:
+    """SoupStrainer that keeps exactly the elements a simple selector matches"""
+    kind, value = compile_selector(selector)
+    if kind == 'name':
+        return SoupStrainer(value)
+    return class_strainer([value], substring=(kind == 'class_substring'))
+
+class PostScan:
+    """Every field candidate of a post, collected in one walk of its subtree
+
+    Matches are recorded per (field, selector) in document order, so
+    `first()` resolves a selector cascade exactly like successive
+    `select_one` calls, and `all()` like successive `select` calls.
+    Fields with a learned path are only indexed if that path fails.
+    """
+
+    _class_index: Dict[str, List[tuple]] = {}
+    _substring_selectors: List[tuple] = []
+    _name_index: Dict[str, List[tuple]] = {}
+    _field_indexes: Dict[frozenset, tuple] = {}
+
+    @classmethod
+    def _build_index(cls):
+        """Group the compiled selectors by how they are looked up"""
+        for field, selectors in FIELD_SELECTORS.items():
+            for position, selector in enumerate(selectors):
+                kind, value = compile_selector(selector)
+                key = (field, position)
+                if kind == 'class':
+                    cls._class_index.setdefault(value, []).append(key)
+                elif kind == 'class_substring':
+                    cls._substring_selectors.append((value, key))
+                else:
+                    cls._name_index.setdefault(value, []).append(key)
+
+    @classmethod
+    def _indexes_for(cls, fields: frozenset) -> tuple:
+        """The selector indexes restricted to some fields, built once per field set"""
+        if fields not in cls._field_indexes:
+            def keep(keys):
+                return [key for key in keys if key[0] in fields]
+            class_index = {value: keep(keys) for value, keys in cls._class_index.items() if keep(keys)}
+            name_index = {value: keep(keys) for value, keys in cls._name_index.items() if keep(keys)}
+            substring_selectors = [(value, key) for value, key in cls._substring_selectors if key[0] in fields]
+            cls._field_indexes[fields] = (class_index, substring_selectors, name_index)
+        return cls._field_indexes[fields]
+
+    def __init__(self, element: Tag, paths: Dict[str, Any] = None):
+        self.element = element
+        self.paths = paths or {}
+        self.matches: Dict[tuple, List[Tag]] = {}
+        self.id_elements: List[Tag] = []
+        self.links: List[Tag] = []
+        self.noise: List[Tag] = []
+        self.excluded: Set[int] = set()
+        self.located: Dict[str, Optional[Tag]] = {}
+        self.accepted: Dict[str, Tag] = {}
+        self.indexed = frozenset(field for field in FIELD_SELECTORS if field not in self.paths)
+        self._scan(self.indexed, collect=True)
+
+    def _scan(self, fields: frozenset, collect: bool = False):
+        """Walk the post subtree once, recording candidates of `fields`
+
+        With `collect`, ids, links and noise elements are recorded as well.
+        """
+        matches = self.matches
+        class_index, substring_selectors, name_index = self._indexes_for(fields)
+
+        for node in self.element.descendants:
+            if not isinstance(node, Tag):
+                continue
+
+            attrs = node.attrs
+            hits = []
+
+            classes = attrs.get('class')
+            if classes:
+                if isinstance(classes, str):
+                    classes = classes.split()
+                for class_name in classes:
+                    if class_name in class_index:
+                        hits.extend(class_index[class_name])
+                class_text = ' '.join(classes)
+                for value, key in substring_selectors:
+                    if value in class_text:
+                        hits.append(key)
+                if collect and NOISE_CLASS_PATTERN.search(class_text):
+                    self.noise.append(node)
+
+            name = node.name
+            if name in name_index:
+                hits.extend(name_index[name])
+
+            # A tag matching two selectors of one field is recorded once per selector
+            for key in set(hits):
+                matches.setdefault(key, []).append(node)
+
+            if not collect:
+                continue
+
+            element_id = attrs.get('id')
+            if element_id is not None and POST_ID_PATTERN.search(element_id):
+                self.id_elements.append(node)
+
+            if name == 'a' and attrs.get('href') is not None:
+                self.links.append(node)
+
+    def _require(self, field: str):
+        """Index a field skipped in favour of its learned path"""
+        if field not in self.indexed:
+            self._scan(frozenset([field]))
+            self.indexed = self.indexed | {field}
+
+    def first(self, field: str, position: int) -> Optional[Tag]:
+        """First element matching one selector of a field, like select_one"""
+        self._require(field)
+        elements = self.matches.get((field, position))
+        return elements[0] if elements else None
+
+    def all(self, field: str, position: int) -> List[Tag]:
+        """All elements matching one selector of a field, like select"""
+        self._require(field)
+        return self.matches.get((field, position), [])
+
+    def candidates(self, field: str) -> Iterator[Tag]:
+        """Elements to try for a field: its learned path, then the selector cascade"""
+        located = None
+        path = self.paths.get(field)
+        if path is not None:
+            located = path.locate(self.element)
+            self.located[field] = located
+            if located is not None:
+                yield located
+
+        for position in range(len(FIELD_SELECTORS[field])):
+            element = self.first(field, position)
+            if element is not None and element is not located:
+                yield element
+
+    def accept(self, field: str, element: Tag):
+        """Record the element a field's value was taken from"""
+        self.accepted[field] = element
+
+    def noise_within(self, element: Tag) -> List[Tag]:
+        """Noise elements below `element`, like find_all(class_=NOISE_CLASS_PATTERN)"""
+        return [noise for noise in self.noise
+                if any(parent is element for parent in noise.parents)]
+
+    def exclude(self, elements: List[Tag]):
+        """Leave elements out of the text built by `text()`"""
+        self.excluded.update(id(element) for element in elements)
+
+    def text(self, element: Tag) -> str:
+        """element.get_text(), leaving out excluded subtrees without touching the tree"""
+        if not self.excluded:
+            return element.get_text()
+        return text_excluding(element, self.excluded)
+
+PostScan._build_index()
+
+def text_excluding(element: Tag, excluded: Set[int]) -> str:
+    """Concatenated strings of element, as get_text() does, skipping excluded subtrees (by id)"""
+    # get_text() only counts the string types the element considers interesting
+    string_types = element.interesting_string_types
+    parts = []
+    stack = [iter(element.children)]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, Tag):
+                if id(node) not in excluded:
+                    stack.append(iter(node.children))
+                    break
+            elif (type(node) is string_types if isinstance(string_types, type)
+                    else type(node) in string_types):
+                parts.append(node)
+        else:
+            stack.pop()
+    return ''.join(parts)
+
+class SubtreeSummary(NamedTuple):
+    """Text and marker facts about one element, as seen by get_text()/find()"""
+    text_length: int  # len(element.get_text().strip())
+    word_count: int  # len(element.get_text().split())
+    markers: Dict[str, bool]  # marker name -> a descendant's class matches
+
+class _TextRun:
+    """Whitespace shape of a concatenated text run, merged left to right"""
+
+    __slots__ = ('length', 'leading', 'trailing', 'words', 'starts_word', 'ends_word', 'blank')
+
+    def __init__(self, text: str = ''):
+        self.length = len(text)
+        stripped = text.strip()
+        self.blank = not stripped
+        self.leading = len(text) - len(text.lstrip())
+        self.trailing = len(text) - len(text.rstrip())
+        self.words = len(stripped.split()) if stripped else 0
+        self.starts_word = bool(text) and not text[0].isspace()
+        self.ends_word = bool(text) and not text[-1].isspace()
+
+    def extend(self, other: '_TextRun'):
+        """Append another run, as if their texts were concatenated"""
+        if not other.length:
+            return
+        if not self.length:
+            for slot in self.__slots__:
+                setattr(self, slot, getattr(other, slot))
+            return
+        self.words += other.words - (1 if self.ends_word and other.starts_word else 0)
+        if self.blank:
+            self.leading = self.length + other.leading
+        self.trailing = other.trailing if not other.blank else self.trailing + other.length
+        self.blank = self.blank and other.blank
+        self.ends_word = other.ends_word
+        self.length += other.length
+
+    def stripped_length(self) -> int:
+        """Length of the text once leading and trailing whitespace is stripped"""
+        return 0 if self.blank else self.length - self.leading - self.trailing
+
+def summarize_subtrees(root: Tag, names: List[str],
+                       markers: Dict[str, Pattern]) -> List[Tuple[Tag, SubtreeSummary]]:
+    """Summarize every `names` element below root in one bottom-up pass
+
+    Equivalent to calling get_text() and find(class_=pattern) on each
+    element, which re-reads the same text at every ancestor and is
+    quadratic on deeply nested layouts. Results are in document order,
+    like find_all(names).
+    """
+    first = root.find(names)
+    if first is None:
+        return []
+
+    # get_text() only counts the string types the element considers interesting
+    string_types = first.interesting_string_types
+    wanted = set(names)
+    results = []
+    summaries = {}
+
+    # Each frame: [tag, text run, markers below, markers on the tag itself]
+    stack = []
+
+    def close_frame():
+        tag, run, below, own = stack.pop()
+        if id(tag) in summaries:
+            summaries[id(tag)] = SubtreeSummary(run.stripped_length(), run.words, below)
+        if stack:
+            parent = stack[-1]
+            parent[1].extend(run)
+            for name in markers:
+                parent[2][name] = parent[2][name] or below[name] or own[name]
+
+    for node in root.descendants:
+        parent = node.parent
+        while stack and stack[-1][0] is not parent:
+            close_frame()
+
+        if isinstance(node, Tag):
+            classes = node.attrs.get('class')
+            if isinstance(classes, list):
+                classes = ' '.join(classes)
+            own = {name: bool(classes) and bool(pattern.search(classes)) for name, pattern in markers.items()}
+            if node.name in wanted:
+                summaries[id(node)] = None
+                results.append(node)
+            stack.append([node, _TextRun(), {name: False for name in markers}, own])
+        elif isinstance(node, NavigableString) and stack:
+            node_type = type(node)
+            if (node_type is string_types if isinstance(string_types, type)
+                    else node_type in string_types):
+                stack[-1][1].extend(_TextRun(node))
+
+    while stack:
+        close_frame()
+
+    return [(element, summaries[id(element)]) for element in results]
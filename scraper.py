@@ -4,18 +4,21 @@ Main scraper class for Imamother Forum
 import requests
 import time
 import json
-import csv
 import logging
 import os
+import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import random
 
 from config import ScrapingConfig
-from data_extractor import DataExtractor
+from data_extractor import DataExtractor, StreamingDataExtractor
+from page_archive import PageArchive
+from tokenization import public_record
+from storage import CsvPostWriter, JsonLinesSection, JsonLinesSink, PostStore, WHOLE_RUN_FORMATS, compressed_path, open_data, write_parquet
 from utils import setup_logging, create_output_directory, sanitize_filename
 
 class ImamotherScraper:
@@ -26,7 +29,8 @@ class ImamotherScraper:
         self.session = requests.Session()
         self.ua = UserAgent()
         self.logger = setup_logging(self.config.LOG_LEVEL, self.config.LOG_FILE)
-        self.data_extractor = DataExtractor()
+        extractor_class = StreamingDataExtractor if self.config.STREAMING_EXTRACTION else DataExtractor
+        self.data_extractor = extractor_class(self.config)
         self.scraped_data = []
         self.session_active = False
         self.last_request_time = 0
@@ -34,6 +38,31 @@ class ImamotherScraper:
         # Create output directory
         create_output_directory(self.config.OUTPUT_DIR)
         
+        # Start from selectors learned on previous runs
+        self.selector_plan_path = os.path.join(self.config.OUTPUT_DIR, self.config.SELECTOR_PLAN_FILE)
+        self.data_extractor.load_selector_plan(self.selector_plan_path)
+        
+        # Keep every fetched page so extraction can be re-run without refetching
+        self.page_archive = None
+        if self.config.ARCHIVE_PAGES:
+            self.page_archive = PageArchive(os.path.join(self.config.OUTPUT_DIR, self.config.ARCHIVE_DIR))
+        
+        # Posts are appended page by page, so an interrupted run keeps what it scraped
+        self.run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.post_sink = None
+        if 'jsonl' in self.config.OUTPUT_FORMATS:
+            filepath = os.path.join(self.config.OUTPUT_DIR, f"imamother_scrape_{self.run_timestamp}.jsonl")
+            self.post_sink = JsonLinesSink(compressed_path(filepath, self.config.OUTPUT_COMPRESSION.get('jsonl')))
+        self.csv_writers: Dict[str, CsvPostWriter] = {}
+        self.post_store = None
+        if 'sqlite' in self.config.OUTPUT_FORMATS:
+            self.post_store = PostStore(os.path.join(self.config.OUTPUT_DIR, self.config.SQLITE_FILE))
+        
+        # Scraped posts stay in memory only when the end of the run needs all of
+        # them at once; otherwise sections are read back from the JSON Lines file
+        self.retain_posts = (self.post_sink is None or self._pages_lack_corpus_fields()
+                             or any(format_type in WHOLE_RUN_FORMATS for format_type in self.config.OUTPUT_FORMATS))
+        
         # Set initial headers
         self._set_random_user_agent()
         
@@ -175,8 +204,13 @@ class ImamotherScraper:
             self.logger.error(f"Login error: {e}")
             return False
     
-    def scrape_section(self, section_name: str, max_pages: int = None) -> List[Dict]:
-        """Scrape a specific forum section"""
+    def scrape_section(self, section_name: str, max_pages: int = None) -> Union[List[Dict], JsonLinesSection]:
+        """Scrape a specific forum section
+        
+        Returns the section's posts, or a view reading them back from the
+        JSON Lines file when the run does not keep them in memory
+        (retain_posts).
+        """
         if not self.session_active:
             self.logger.error("Not logged in. Please login first.")
             return []
@@ -190,6 +224,7 @@ class ImamotherScraper:
         
         self.logger.info(f"Starting to scrape section: {section_name}")
         section_data = []
+        post_count = 0
         
         for page in range(1, max_pages + 1):
             page_url = f"{section_url}?page={page}"
@@ -200,13 +235,22 @@ class ImamotherScraper:
                 self.logger.warning(f"Failed to fetch page {page}")
                 continue
             
+            if self.page_archive:
+                try:
+                    self.page_archive.append(page_url, section_name, response.content)
+                except OSError as e:
+                    self.logger.warning(f"Error archiving page {page}: {e}")
+            
             # Extract data from page
             page_data = self.data_extractor.extract_page_data(response.content, section_name)
             if not page_data:
                 self.logger.info(f"No more data found on page {page}, stopping")
                 break
             
-            section_data.extend(page_data)
+            self._write_page(section_name, page, page_data)
+            if self.retain_posts:
+                section_data.extend(page_data)
+            post_count += len(page_data)
             self.logger.info(f"Extracted {len(page_data)} items from page {page}")
             
             # Check if this is the last page
@@ -214,9 +258,36 @@ class ImamotherScraper:
                 self.logger.info("Reached last page")
                 break
         
-        self.logger.info(f"Completed scraping {section_name}: {len(section_data)} total items")
+        if section_name in self.csv_writers:
+            self.csv_writers[section_name].close()
+        self.data_extractor.save_selector_plan(self.selector_plan_path)
+        self.logger.info(f"Completed scraping {section_name}: {post_count} total items")
+        if not self.retain_posts:
+            return JsonLinesSection(self.post_sink.path, section_name, post_count)
         return section_data
     
+    def _write_page(self, section_name: str, page: int, page_data: List[Dict]):
+        """Write a page's posts to the outputs that are kept up to date while scraping"""
+        sinks = [self.post_sink, self.post_store]
+        if 'csv' in self.config.OUTPUT_FORMATS:
+            if section_name not in self.csv_writers:
+                filename = f"imamother_scrape_{section_name}_{self.run_timestamp}.csv"
+                filepath = os.path.join(self.config.OUTPUT_DIR, filename)
+                self.csv_writers[section_name] = CsvPostWriter(
+                    compressed_path(filepath, self.config.OUTPUT_COMPRESSION.get('csv')))
+            sinks.append(self.csv_writers[section_name])
+        
+        for sink in sinks:
+            if sink:
+                try:
+                    sink.write(page_data)
+                except (OSError, sqlite3.Error) as e:
+                    self.logger.warning(f"Error writing posts of page {page} to {sink.path}: {e}")
+    
+    def _pages_lack_corpus_fields(self) -> bool:
+        """Whether posts written page by page miss fields the inline analysis adds once every post is in"""
+        return self.config.ANALYSIS_MODE == 'inline' and self.data_extractor.corpus_analysis
+    
     def scrape_all_sections(self) -> Dict[str, List[Dict]]:
         """Scrape all configured forum sections"""
         if not self.session_active:
@@ -241,31 +312,73 @@ class ImamotherScraper:
         prefix = filename_prefix or "imamother_data"
         
         for format_type in self.config.OUTPUT_FORMATS:
-            if format_type == 'json':
+            codec = self.config.OUTPUT_COMPRESSION.get(format_type)
+            if format_type == 'jsonl':
+                # Scraped posts were already written page by page, before the
+                # corpus-wide analysis, whose fields replace them here
+                if self.post_sink and self.post_sink.records_written:
+                    if self._pages_lack_corpus_fields():
+                        self.post_sink.rewrite(post for section_data in data.values() for post in section_data)
+                    # Finish the file (and its compressed stream) before it is read back
+                    self.post_sink.close()
+                    self.logger.info(f"Data saved to JSON Lines: {self.post_sink.path}")
+                    continue
+                filepath = compressed_path(os.path.join(self.config.OUTPUT_DIR, f"{prefix}_{timestamp}.jsonl"), codec)
+                with JsonLinesSink(filepath) as sink:
+                    for section_data in data.values():
+                        sink.write(section_data)
+                
+                self.logger.info(f"Data saved to JSON Lines: {filepath}")
+            
+            elif format_type == 'json':
                 filename = f"{prefix}_{timestamp}.json"
-                filepath = os.path.join(self.config.OUTPUT_DIR, filename)
+                filepath = compressed_path(os.path.join(self.config.OUTPUT_DIR, filename), codec)
                 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                # Working fields such as the normalized text are never written out
+                saved = {section_name: [public_record(item) for item in section_data]
+                         for section_name, section_data in data.items()}
+                with open_data(filepath, 'w') as f:
+                    json.dump(saved, f, indent=2, ensure_ascii=False, default=str)
                 
                 self.logger.info(f"Data saved to JSON: {filepath}")
             
+            elif format_type == 'parquet':
+                filepath = os.path.join(self.config.OUTPUT_DIR, f"{prefix}_{timestamp}.parquet")
+                try:
+                    write_parquet(filepath, data, codec)
+                except (ImportError, ValueError) as e:
+                    self.logger.warning(f"Skipping Parquet output: {e}")
+                    continue
+                
+                self.logger.info(f"Data saved to Parquet: {filepath}")
+            
+            elif format_type == 'sqlite':
+                # Posts stored page by page are updated with the finished analysis
+                if self.post_store.records_written and not self._pages_lack_corpus_fields():
+                    self.logger.info(f"Data saved to SQLite: {self.post_store.path}")
+                    continue
+                for section_data in data.values():
+                    self.post_store.write(section_data)
+                
+                self.logger.info(f"Data saved to SQLite: {self.post_store.path}")
+            
             elif format_type == 'csv':
-                # Save each section as a separate CSV
+                # Save each section as a separate CSV, unless it was written page by
+                # page; corpus-wide analysis fields are filled in here
                 for section_name, section_data in data.items():
+                    writer = self.csv_writers.get(section_name)
+                    if writer and writer.records_written:
+                        if self._pages_lack_corpus_fields():
+                            writer.rewrite(section_data)
+                            writer.close()
+                        self.logger.info(f"Data saved to CSV: {writer.path}")
+                        continue
                     if section_data:
                         filename = f"{prefix}_{section_name}_{timestamp}.csv"
-                        filepath = os.path.join(self.config.OUTPUT_DIR, filename)
-                        
-                        # Get all unique keys for CSV headers
-                        all_keys = set()
-                        for item in section_data:
-                            all_keys.update(item.keys())
+                        filepath = compressed_path(os.path.join(self.config.OUTPUT_DIR, filename), codec)
                         
-                        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                            writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
-                            writer.writeheader()
-                            writer.writerows(section_data)
+                        with CsvPostWriter(filepath) as writer:
+                            writer.write(section_data)
                         
                         self.logger.info(f"Data saved to CSV: {filepath}")
     
@@ -287,4 +400,12 @@ class ImamotherScraper:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.logout()
\ No newline at end of file
+        self.logout()
+        if self.page_archive:
+            self.page_archive.close()
+        if self.post_sink:
+            self.post_sink.close()
+        if self.post_store:
+            self.post_store.close()
+        for writer in self.csv_writers.values():
+            writer.close()
\ No newline at end of file
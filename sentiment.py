@@ -0,0 +1,121 @@
+"""
+Lexicon-based sentiment scoring over batches of tokenized posts
+"""
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+# Word valence from -3 (very negative) to 3 (very positive)
+DEFAULT_LEXICON: Dict[str, float] = {
+    # Emotional indicators
+    'worried': -1.8, 'scared': -2.2, 'excited': 2.2, 'frustrated': -2.0, 'happy': 2.5,
+    'sad': -2.1, 'anxious': -1.9, 'grateful': 2.4, 'confused': -1.3, 'hopeful': 1.8,
+    # Positive
+    'love': 2.8, 'loved': 2.7, 'loving': 2.4, 'great': 2.6, 'good': 1.8, 'best': 2.4,
+    'better': 1.6, 'amazing': 2.9, 'wonderful': 2.8, 'awesome': 2.6, 'fantastic': 2.8,
+    'thank': 1.6, 'thanks': 1.8, 'thankful': 2.2, 'blessed': 2.2, 'blessing': 2.2,
+    'glad': 2.0, 'relieved': 1.8, 'relief': 1.6, 'calm': 1.2, 'easy': 1.4,
+    'helpful': 1.9, 'recommend': 1.3, 'recommended': 1.3, 'beautiful': 2.4, 'nice': 1.8,
+    'enjoy': 2.0, 'enjoyed': 2.0, 'fun': 2.0, 'healthy': 1.6, 'safe': 1.4,
+    'success': 2.2, 'successful': 2.2, 'works': 0.9, 'worked': 0.9, 'perfect': 2.6,
+    'mazel': 2.4, 'congratulations': 2.6, 'congrats': 2.4, 'smile': 1.8, 'proud': 2.0,
+    'support': 1.2, 'supportive': 1.9, 'kind': 1.8, 'comfortable': 1.6, 'fine': 0.8,
+    # Negative
+    'hate': -2.7, 'hated': -2.7, 'bad': -2.1, 'worse': -2.1, 'worst': -2.8,
+    'terrible': -2.8, 'awful': -2.7, 'horrible': -2.8, 'afraid': -2.0, 'fear': -2.0,
+    'stress': -1.8, 'stressed': -2.0, 'stressful': -2.0, 'overwhelmed': -2.1, 'tired': -1.4,
+    'exhausted': -2.0, 'pain': -2.1, 'painful': -2.2, 'hurt': -2.1, 'hurts': -2.1,
+    'sick': -1.8, 'problem': -1.4, 'problems': -1.4, 'issue': -0.9, 'issues': -1.0,
+    'difficult': -1.6, 'hard': -0.9, 'struggle': -1.8, 'struggling': -2.0, 'upset': -2.0,
+    'angry': -2.4, 'annoyed': -1.8, 'annoying': -1.9, 'lonely': -2.0, 'alone': -1.2,
+    'cry': -1.8, 'crying': -1.9, 'miscarriage': -2.4, 'loss': -2.0, 'lost': -1.3,
+    'desperate': -2.3, 'disappointed': -2.0, 'nervous': -1.6, 'panic': -2.4, 'wrong': -1.5,
+    'fail': -2.0, 'failed': -2.0, 'guilt': -1.9, 'guilty': -1.9, 'unfortunately': -1.4,
+    'depressed': -2.6, 'depression': -2.4, 'emergency': -1.6, 'dangerous': -2.2, 'scary': -2.1
+}
+
+# Words that flip the valence of the sentiment words just after them;
+# 't' is the tail of every "n't" contraction (don't -> don, t)
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'neither', 'nor', 'without',
+    't', 'dont', 'cant', 'wont', 'isnt', 'didnt', 'doesnt', 'wasnt', 'arent', 'hardly'
+})
+
+# Words that strengthen the sentiment word right after them
+BOOSTERS: Dict[str, float] = {
+    'very': 0.3, 'so': 0.2, 'really': 0.3, 'extremely': 0.5, 'super': 0.3,
+    'totally': 0.3, 'incredibly': 0.5, 'absolutely': 0.4, 'completely': 0.3, 'too': 0.2
+}
+
+# How far back a negation reaches, in tokens
+NEGATION_WINDOW = 3
+
+# Factor applied to a negated sentiment word
+NEGATION_FACTOR = -0.74
+
+# Normalization constant of the polarity score, sum / sqrt(sum^2 + alpha)
+POLARITY_ALPHA = 15.0
+
+# Polarity beyond which a post counts as positive or negative
+NEUTRAL_THRESHOLD = 0.05
+
+class SentimentScorer:
+    """Polarity and intensity of posts from a word valence lexicon
+
+    Each batch's tokens are mapped to integer ids in one flat array, with
+    id 0 for words outside the lexicon. Valences, negations within the
+    previous NEGATION_WINDOW tokens and boosters right before a word are
+    then applied with array ops, and per-post sums come from bincount
+    over the row of each token.
+
+    Polarity is the summed valence normalized into [-1, 1]; intensity is
+    the mean absolute valence per token.
+    """
+
+    def __init__(self, lexicon: Dict[str, float] = None):
+        lexicon = lexicon if lexicon is not None else DEFAULT_LEXICON
+        words = list(dict.fromkeys(list(lexicon) + sorted(NEGATIONS) + sorted(BOOSTERS)))
+        self.ids: Dict[str, int] = {word: index + 1 for index, word in enumerate(words)}
+
+        self.valence = np.zeros(len(words) + 1)
+        self.negates = np.zeros(len(words) + 1, dtype=bool)
+        self.boost = np.zeros(len(words) + 1)
+        for word, index in self.ids.items():
+            self.valence[index] = lexicon.get(word, 0.0)
+            self.negates[index] = word in NEGATIONS
+            self.boost[index] = BOOSTERS.get(word, 0.0)
+
+    def score(self, documents: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Polarity and intensity arrays of a batch of token sequences"""
+        count = len(documents)
+        lengths = np.fromiter((len(tokens) for tokens in documents), dtype=np.int64, count=count)
+        lookup = self.ids.get
+        ids = np.fromiter((lookup(token, 0) for tokens in documents for token in tokens),
+                          dtype=np.int64, count=int(lengths.sum()))
+
+        # Offset of every token within its own post, so look-backs stay inside it
+        rows = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        offsets = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        values = self.valence[ids]
+        negated = np.zeros(len(ids), dtype=bool)
+        for back in range(1, NEGATION_WINDOW + 1):
+            negated[back:] |= self.negates[ids[:-back]] & (offsets[back:] >= back)
+        boosted = np.zeros(len(ids))
+        boosted[1:] = np.where(offsets[1:] >= 1, self.boost[ids[:-1]], 0.0)
+
+        values = values * (1.0 + boosted) * np.where(negated, NEGATION_FACTOR, 1.0)
+        totals = np.bincount(rows, weights=values, minlength=count)
+        absolute = np.bincount(rows, weights=np.abs(values), minlength=count)
+
+        polarity = totals / np.sqrt(totals * totals + POLARITY_ALPHA)
+        intensity = absolute / np.maximum(lengths, 1)
+        return polarity, intensity
+
+def sentiment_label(polarity: float) -> str:
+    """'positive', 'negative' or 'neutral' for a polarity score"""
+    if polarity > NEUTRAL_THRESHOLD:
+        return 'positive'
+    if polarity < -NEUTRAL_THRESHOLD:
+        return 'negative'
+    return 'neutral'
@@ -0,0 +1,477 @@
+"""
+Post record storage: incremental sinks and readers for saved data files
+"""
+import io
+import os
+import csv
+import gzip
+import lzma
+import json
+import sqlite3
+import logging
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from tokenization import public_record
+from analysis_cache import content_digest
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Columns of the Parquet file and the SQLite store, in order, with their
+# type names; fields outside this list are not written
+POST_COLUMNS = [
+    ('section', 'string'), ('extracted_at', 'string'), ('post_id', 'string'),
+    ('author', 'string'), ('timestamp', 'string'), ('content', 'string'), ('title', 'string'),
+    ('replies_count', 'int64'), ('views_count', 'int64'), ('tags', 'strings'), ('links', 'links'),
+    ('is_question', 'bool'), ('is_answer', 'bool'), ('sentiment_indicators', 'strings'),
+    ('resource_mentions', 'strings'), ('keywords', 'strings'), ('analyzed_with', 'string'),
+    ('sentiment_polarity', 'float64'), ('sentiment_intensity', 'float64')
+]
+
+# Output formats written from every post of a run at once, at the end of it
+WHOLE_RUN_FORMATS = ('json', 'parquet')
+
+# File extension of each compression codec
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+
+def compressed_path(path: str, codec: Optional[str] = None) -> str:
+    """The path with the extension of a compression codec, unchanged without one"""
+    return path + COMPRESSION_EXTENSIONS[codec] if codec else path
+
+def compression_of(path: str) -> Optional[str]:
+    """Compression codec of a file, from its extension"""
+    for codec, extension in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(extension):
+            return codec
+    return None
+
+def data_format(path: str) -> str:
+    """Extension of a file's data format, e.g. '.json' for 'data.json.gz'"""
+    codec = compression_of(path)
+    if codec:
+        path = path[:-len(COMPRESSION_EXTENSIONS[codec])]
+    return os.path.splitext(path)[1]
+
+def open_data(path: str, mode: str = 'r', newline: str = None) -> IO[str]:
+    """Open a data file as UTF-8 text, streaming through the codec its extension names
+
+    Modes are 'r', 'w' and 'a'; appending to a compressed file adds a new
+    gzip member, xz stream or zstd frame, which reading goes on through.
+    """
+    codec = compression_of(path)
+    if codec == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', newline=newline)
+    if codec == 'xz':
+        return lzma.open(path, mode + 't', encoding='utf-8', newline=newline)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required for .zst files")
+        if mode == 'r':
+            stream = io.BufferedReader(_ZstdReader(open(path, 'rb')))
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, mode + 'b'))
+        return io.TextIOWrapper(stream, encoding='utf-8', newline=newline)
+    return open(path, mode, encoding='utf-8', newline=newline)
+
+class _ZstdReader(io.RawIOBase):
+    """Decompressed bytes of every zstd frame in a file, including an unfinished last frame
+
+    zstandard's stream_reader stops sized reads at the end of an
+    unfinished frame before returning all it decompressed, which loses
+    the pages flushed into a file that is still being written.
+    """
+
+    def __init__(self, raw: IO[bytes], read_size: int = 1 << 16):
+        self._raw = raw
+        self._read_size = read_size
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._frame = self._decompressor.decompressobj()
+        self._pending = b''
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset == len(self._pending):
+            data = self._raw.read(self._read_size)
+            if not data:
+                return 0
+            output = []
+            while data:
+                output.append(self._frame.decompress(data))
+                data = b''
+                if self._frame.eof:
+                    # Appending wrote another frame after this one
+                    data = self._frame.unused_data
+                    self._frame = self._decompressor.decompressobj()
+            self._pending, self._offset = b''.join(output), 0
+
+        size = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:size] = self._pending[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+class JsonLinesSink:
+    """Appends post records to a JSON Lines file, one post per line
+
+    Each `write` call is one page of posts and ends with a flush, so an
+    interrupted run keeps every page written so far. Records carry their
+    section, so the file alone is enough to rebuild the section layout.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records_written = 0
+        self._file = None
+
+    def write(self, records: Iterable[Dict]) -> int:
+        """Append records and flush, returning how many were written"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open_data(self.path, 'a')
+
+        written = 0
+        for record in records:
+            self._file.write(json.dumps(public_record(record), ensure_ascii=False, default=str) + '\n')
+            written += 1
+        self._file.flush()
+        self.records_written += written
+        return written
+
+    def rewrite(self, records: Iterable[Dict]) -> int:
+        """Replace every record written so far with `records`, returning how many were written"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.records_written = 0
+        return self.write(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """Records of a JSON Lines file, skipping lines that do not parse (e.g. cut off by a crash)"""
+    with open_data(path) as f:
+        try:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed line {line_number} of {path}")
+        except EOFError:
+            # A compressed stream that was never closed; everything flushed was read
+            logger.warning(f"Compressed data of {path} ends early, reading stopped there")
+
+class JsonLinesSection:
+    """One section's posts in a JSON Lines file, read from the file on each iteration
+
+    Stands in for the list of a section's posts once they were written
+    out and dropped from memory; `len` is the number of posts written.
+    """
+
+    def __init__(self, path: str, section: str, count: int = 0):
+        self.path = path
+        self.section = section
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (record for record in iter_jsonl(self.path) if record.get('section') == self.section)
+
+def post_schema() -> 'pa.Schema':
+    """Arrow schema of the Parquet post file; list fields are nested columns"""
+    types = {
+        'string': pa.string(), 'int64': pa.int64(), 'bool': pa.bool_(), 'float64': pa.float64(),
+        'strings': pa.list_(pa.string()),
+        'links': pa.list_(pa.struct([('url', pa.string()), ('text', pa.string()), ('type', pa.string())]))
+    }
+    return pa.schema([(name, types[type_name]) for name, type_name in POST_COLUMNS])
+
+def write_parquet(path: str, data: Dict[str, List[Dict]], codec: Optional[str] = None) -> int:
+    """Write posts of every section to one Parquet file, returning how many were written
+
+    Parquet compresses its column pages itself, so `codec` ('gzip' or
+    'zstd') replaces its default snappy codec instead of naming a file
+    extension.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet output")
+    if codec not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Parquet files cannot be compressed with {codec}")
+    records = [public_record(post) for posts in data.values() for post in posts]
+    pq.write_table(pa.Table.from_pylist(records, schema=post_schema()), path, compression=codec or 'snappy')
+    return len(records)
+
+def read_parquet(path: str, columns: Sequence[str] = None) -> List[Dict]:
+    """Post records of a Parquet file, reading only `columns` when given"""
+    if pq is None:
+        raise ImportError("pyarrow is required to read Parquet files")
+    return pq.read_table(path, columns=list(columns) if columns else None).to_pylist()
+
+def load_posts(path: str) -> Dict[str, List[Dict]]:
+    """Saved posts by section, from a JSON data file, a JSON Lines post file,
+    a Parquet file or a SQLite post store; JSON files may be compressed"""
+    file_format = data_format(path)
+    if file_format in ('.jsonl', '.parquet', '.db'):
+        if file_format == '.db':
+            # Connecting would create an empty database in its place
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No such post store: {path}")
+            with PostStore(path) as store:
+                records = list(store.iter_posts())
+            for record in records:
+                del record['rowid']
+        else:
+            records = iter_jsonl(path) if file_format == '.jsonl' else read_parquet(path)
+        data: Dict[str, List[Dict]] = {}
+        for record in records:
+            data.setdefault(record.get('section', ''), []).append(record)
+        return data
+
+    with open_data(path) as f:
+        return json.load(f)
+
+# SQLite column type of each POST_COLUMNS type; lists are stored as JSON text
+_SQLITE_TYPES = {'string': 'TEXT', 'int64': 'INTEGER', 'bool': 'INTEGER', 'float64': 'REAL',
+                 'strings': 'TEXT', 'links': 'TEXT'}
+
+class PostStore:
+    """SQLite database of posts with a full-text index over title and content
+
+    Posts are keyed on (section, post_key), where post_key is the post id,
+    or a digest of the content for posts without one, so writing a post
+    again updates its row instead of adding a duplicate. `posts_fts` is an
+    FTS5 table over the posts' title and content, kept in sync by
+    triggers. It uses the trigram tokenizer, so a query term matches
+    anywhere in the text, case-insensitively, like `term in text.lower()`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records_written = 0
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._create_tables()
+        return self._connection
+
+    def _create_tables(self):
+        columns = ', '.join(f"{name} {_SQLITE_TYPES[type_name]}" for name, type_name in POST_COLUMNS)
+        self._connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS posts (
+                post_key TEXT NOT NULL, {columns},
+                PRIMARY KEY (section, post_key)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, content, content='posts', content_rowid='rowid', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS posts_insert AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts (rowid, title, content) VALUES (new.rowid, new.title, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_delete AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, content)
+                VALUES ('delete', old.rowid, old.title, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_update AFTER UPDATE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, content)
+                VALUES ('delete', old.rowid, old.title, old.content);
+                INSERT INTO posts_fts (rowid, title, content) VALUES (new.rowid, new.title, new.content);
+            END;
+        """)
+
+    def write(self, records: Iterable[Dict]) -> int:
+        """Insert or update records in one transaction, returning how many were written"""
+        names = [name for name, _ in POST_COLUMNS]
+        updates = ', '.join(f"{name} = excluded.{name}" for name in names if name != 'section')
+        statement = (f"INSERT INTO posts (post_key, {', '.join(names)}) "
+                     f"VALUES ({', '.join('?' * (len(names) + 1))}) "
+                     f"ON CONFLICT (section, post_key) DO UPDATE SET {updates}")
+        rows = [self._row(public_record(record)) for record in records]
+        with self.connection:
+            self.connection.executemany(statement, rows)
+        self.records_written += len(rows)
+        return len(rows)
+
+    @staticmethod
+    def _row(record: Dict) -> tuple:
+        """Values of a record in column order, after its post_key"""
+        post_key = record.get('post_id') or content_digest(record.get('content') or '').hex()
+        values = [post_key]
+        for name, type_name in POST_COLUMNS:
+            value = record.get(name)
+            if type_name in ('strings', 'links') and value is not None:
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            elif type_name == 'string' and value is not None:
+                value = str(value)
+            values.append(value)
+        return tuple(values)
+
+    def iter_posts(self, columns: Sequence[str] = None) -> Iterator[Dict]:
+        """Stored post records with their rowid, only `columns` of them when given"""
+        types = dict(POST_COLUMNS)
+        names = [name for name in (columns or types) if name in types]
+        cursor = self.connection.execute(f"SELECT rowid, {', '.join(names)} FROM posts ORDER BY rowid")
+        for row in cursor:
+            record = {'rowid': row[0]}
+            for name, value in zip(names, row[1:]):
+                if value is not None and types[name] in ('strings', 'links'):
+                    value = json.loads(value)
+                elif value is not None and types[name] == 'bool':
+                    value = bool(value)
+                record[name] = value
+            yield record
+
+    def matching(self, terms: Sequence[str], column: str = 'content') -> Set[int]:
+        """Rowids of posts whose column contains any of the terms, from the full-text index
+
+        Trigram queries need terms of at least three characters.
+        """
+        quoted = ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        cursor = self.connection.execute("SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?",
+                                         (f"{column} : ({quoted})",))
+        return {rowid for rowid, in cursor}
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class CsvPostWriter:
+    """Writes post records to a CSV file with one column per POST_COLUMNS field
+
+    The header comes from the schema, so records are written as they
+    arrive, a page at a time, without a first pass over every record to
+    collect keys; fields outside the schema are left out. The header is
+    written once, and writes after `close` append to the file. Lists
+    (tags, keywords, links, ...) are written as compact JSON, booleans as
+    'true'/'false' and missing values as empty cells. `read_csv_posts`
+    turns the cells back into values.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records_written = 0
+        self._file = None
+        self._writer = None
+        self._header_written = False
+
+    def write(self, records: Iterable[Dict]) -> int:
+        """Append records and flush, returning how many were written"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open_data(self.path, 'a' if self._header_written else 'w', newline='')
+            self._writer = csv.writer(self._file)
+            if not self._header_written:
+                self._writer.writerow([name for name, _ in POST_COLUMNS])
+                self._header_written = True
+
+        encoders = [(name, _CSV_ENCODERS[type_name]) for name, type_name in POST_COLUMNS]
+        written = 0
+        for record in records:
+            row = []
+            for name, encode in encoders:
+                value = record.get(name)
+                row.append('' if value is None else value if encode is None else encode(value))
+            self._writer.writerow(row)
+            written += 1
+        self._file.flush()
+        self.records_written += written
+        return written
+
+    def rewrite(self, records: Iterable[Dict]) -> int:
+        """Replace every record written so far with `records`, returning how many were written"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.records_written = 0
+        self._header_written = False
+        return self.write(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# Compact JSON of list cells; one encoder, since json.dumps with options builds a new one per call
+_compact_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+
+def _list_cell(value) -> str:
+    return _compact_json(value) if value else '[]'
+
+def _lenient_json(cell: str):
+    # Files from before the schema-driven writer hold Python reprs; keep those as text
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
+
+def _csv_bool(cell: str) -> bool:
+    return cell in ('true', 'True')
+
+# Cell encoding and decoding of each POST_COLUMNS type; None leaves values to the csv module
+_CSV_ENCODERS = {'string': None, 'int64': None, 'float64': None, 'bool': lambda value: 'true' if value else 'false',
+                 'strings': _list_cell, 'links': _list_cell}
+_CSV_DECODERS = {'string': str, 'int64': int, 'float64': float, 'bool': _csv_bool,
+                 'strings': _lenient_json, 'links': _lenient_json}
+
+def iter_csv_posts(path: str) -> Iterator[Dict]:
+    """Post records of a CSV file, with schema columns decoded and empty cells as None"""
+    types = dict(POST_COLUMNS)
+    with open_data(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        decoders = [_CSV_DECODERS[types[name]] if name in types else str for name in header]
+        columns = list(zip(header, decoders))
+        for row in reader:
+            yield {name: decode(cell) if cell else None for (name, decode), cell in zip(columns, row)}
+
+def read_csv_posts(path: str) -> List[Dict]:
+    """All post records of a CSV file written by CsvPostWriter"""
+    return list(iter_csv_posts(path))
+
+def is_data_file(filename: str) -> bool:
+    """Whether a file name is one of the post data formats load_posts reads"""
+    return data_format(filename) in ('.json', '.jsonl', '.parquet')
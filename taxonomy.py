@@ -0,0 +1,120 @@
+"""
+Business opportunity taxonomy shared by the summary statistics and the analyzer
+"""
+import re
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+from config import ScrapingConfig
+from content_matcher import CategoryMatcher
+
+# Opportunity categories: 'keywords' score a post for categorization, and
+# 'related' terms also count as the category being discussed in analysis
+DEFAULT_TAXONOMY = {
+    'categories': {
+        'product': {
+            'keywords': ['product', 'buy', 'purchase', 'recommend', 'brand', 'quality',
+                         'where to find', 'best', 'review', 'comparison'],
+            'related': ['price', 'cost', 'store', 'online', 'amazon', 'target', 'walmart']
+        },
+        'service': {
+            'keywords': ['service', 'help', 'professional', 'expert', 'consultation',
+                         'advice', 'guidance', 'support', 'therapy', 'counseling'],
+            'related': ['doctor', 'specialist', 'coach', 'trainer', 'tutor']
+        },
+        'information': {
+            'keywords': ['information', 'learn', 'understand', 'explain', 'guide',
+                         'tutorial', 'how to', 'what is', 'resource', 'book'],
+            'related': ['article', 'website', 'blog', 'video', 'course']
+        },
+        'community': {
+            'keywords': ['group', 'community', 'support', 'meet', 'connect',
+                         'share', 'experience', 'similar', 'together'],
+            'related': ['local', 'meetup', 'event', 'gathering', 'club']
+        }
+    },
+    # Category of posts matching no keyword, by words in their section name
+    'section_categories': [
+        {'sections': ['pregnancy', 'childbirth'], 'category': 'health_service'},
+        {'sections': ['married'], 'category': 'relationship_service'},
+        {'sections': ['infertility'], 'category': 'medical_service'}
+    ],
+    'default_category': 'general'
+}
+
+# Matcher group holding a category's related terms
+_RELATED = 'related:'
+
+class Taxonomy:
+    """Opportunity categories compiled into one matcher
+
+    Every category keyword and related term is a literal of a single
+    CategoryMatcher, so one scan of a post gives the score of every
+    category: the number of its keywords found in the text, as
+    `keyword in text` would count them. `words` are the text's \\w+
+    tokens when the caller already has them.
+    """
+
+    def __init__(self, definition: Dict):
+        self.categories: Dict[str, Dict[str, List[str]]] = definition['categories']
+        self.section_categories: List[Dict] = definition.get('section_categories', [])
+        self.default_category: str = definition.get('default_category', 'general')
+
+        groups = {}
+        for name, terms in self.categories.items():
+            groups[name] = _literal_patterns(terms.get('keywords', []))
+            groups[_RELATED + name] = _literal_patterns(terms.get('related', []))
+        self.matcher = CategoryMatcher(groups, set())
+
+    @classmethod
+    def from_file(cls, filepath: str) -> 'Taxonomy':
+        """Load a taxonomy from a JSON file shaped like DEFAULT_TAXONOMY"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def scores(self, text: str, words: Iterable[str] = None) -> Dict[str, int]:
+        """Number of each category's keywords found in text, in one scan"""
+        hits = self.matcher.scan(text, words)
+        return {name: len(hits.matched(name)) for name in self.categories}
+
+    def categorize(self, text: str, section: str = '', words: Iterable[str] = None) -> str:
+        """Category with the most keywords in text, or the section's category when none match"""
+        scores = self.scores(text, words)
+        best = max(scores, key=scores.get) if scores else None
+        if best is not None and scores[best] > 0:
+            return best
+
+        for rule in self.section_categories:
+            if any(word in section for word in rule['sections']):
+                return rule['category']
+        return self.default_category
+
+    def mentioned(self, text: str, words: Iterable[str] = None) -> Set[str]:
+        """Categories with a keyword or related term in text"""
+        hits = self.matcher.scan(text, words)
+        return {name for name in self.categories
+                if hits.matched(name) or hits.matched(_RELATED + name)}
+
+def _literal_patterns(terms: List[str]) -> List[Tuple[str, Pattern]]:
+    """(pattern, compiled pattern) pairs matching each distinct term literally"""
+    patterns = [re.escape(term) for term in dict.fromkeys(term.lower() for term in terms)]
+    return [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in patterns]
+
+_taxonomy: Optional[Taxonomy] = None
+_taxonomy_file: Optional[str] = None
+
+def get_taxonomy(filepath: str = None) -> Taxonomy:
+    """The configured taxonomy (ScrapingConfig.TAXONOMY_FILE or the default), compiled once"""
+    global _taxonomy, _taxonomy_file
+    filepath = filepath or ScrapingConfig.TAXONOMY_FILE
+    if _taxonomy is None or filepath != _taxonomy_file:
+        taxonomy = None
+        if filepath:
+            try:
+                taxonomy = Taxonomy.from_file(filepath)
+            except (OSError, ValueError, KeyError) as e:
+                logging.getLogger(__name__).warning(f"Error loading taxonomy {filepath}, using the default: {e}")
+        _taxonomy = taxonomy or Taxonomy(DEFAULT_TAXONOMY)
+        _taxonomy_file = filepath
+    return _taxonomy
@@ -0,0 +1,65 @@
+"""
+Forum pages shared by the tests, shaped like archived Imamother pages
+"""
+import random
+from typing import Dict, List
+
+from tokenization import public_record
+
+WORDS = ['pregnancy', 'doctor', 'baby', 'sleep', 'worried', 'advice', 'book', 'help',
+         'recommend', 'school', 'camp', 'tired', 'grateful', 'website', 'week', 'family']
+
+def listing_page(seed: int, posts: int = 30) -> bytes:
+    """A forum listing page like the archived Imamother ones"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(posts):
+        body = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 80)))
+        quote = f'<blockquote class="quote">Quoting: {" ".join(rng.sample(WORDS, 5))}</blockquote>' if i % 3 == 0 else ''
+        items.append(
+            f'<div class="post" id="post-{seed * 100 + i}"><div class="post-header">'
+            f'<span class="username">member{rng.randint(1, 500)}</span>'
+            f'<time datetime="2024-01-{rng.randint(1, 28):02d}T10:00:00">Jan</time>'
+            f'<h3 class="title">Thread about {rng.choice(WORDS)}</h3></div>'
+            f'<div class="post-content">{quote}<p>{body}?</p>'
+            f'<p>See <a href="https://www.amazon.com/dp/{i}">this {rng.choice(WORDS)}</a></p>'
+            f'<div class="signature">-- sent from my phone</div></div>'
+            f'<div class="post-footer"><span class="replies">{rng.randint(0, 40)} replies</span>'
+            f'<span class="views">{rng.randint(10, 4000)} views</span>'
+            f'<span class="tag">{rng.choice(WORDS)}</span></div></div>'
+        )
+    return f'<html><head><meta charset="utf-8"></head><body>{"".join(items)}</body></html>'.encode('utf-8')
+
+def nested_page() -> bytes:
+    """Posts nested inside each other's content"""
+    nested = b''.join(
+        b'<div class="post" id="post-%d"><span class="author">m%d</span>'
+        b'<div class="content">outer post number %d with a reply <div class="quote">quoted</div>' % (i, i, i)
+        for i in range(5)
+    ) + b'</div></div>' * 5
+    return b'<html><head><meta charset="utf-8"></head><body>' + nested + b'</body></html>'
+
+# Pages every extraction path must agree on
+FIXTURES = {
+    'listing': listing_page(1),
+    'listing-quotes': listing_page(2),
+    'nested': nested_page(),
+    # Unclosed and misnested tags inside posts, repaired by the parser
+    'misnested': (
+        b'<html><body><div class="post"><b>bold <h1 class="title">Title</h1>'
+        b'<div class="content">text of the first post <p>a paragraph <i>in italics</div></b></div>'
+        b'<div class="post"><span class="username">u</span><p class="body">the second post, never closed'
+    ),
+    'declared-windows-1252': (
+        '<html><head><meta charset="windows-1252"></head><body><div class="post">'
+        '<div class="content">caf\xe9 owner ’recommended’ a book</div></div></body></html>'
+    ).encode('windows-1252'),
+    'undeclared-windows-1252': ('<html><body>' + ''.join(
+        f'<div class="post"><span class="author">m{i}</span>'
+        f'<div class="content">the caf\xe9 number {i} is a nice place to meet</div></div>' for i in range(60)
+    ) + '</body></html>').encode('windows-1252')
+}
+
+def comparable(records: List[Dict]) -> List[Dict]:
+    """Saved form of records, without the per-call extraction timestamp"""
+    return [{k: v for k, v in public_record(record).items() if k != 'extracted_at'} for record in records]
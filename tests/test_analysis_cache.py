@@ -0,0 +1,59 @@
+"""
+Cached content analysis must equal analyzing the content again
+"""
+from analysis_cache import AnalysisCache
+from config import ScrapingConfig
+from data_extractor import DataExtractor
+from sample_pages import comparable, listing_page
+
+SECTION = 'general_discussion'
+
+def make_extractor(cache_size: int, **settings) -> DataExtractor:
+    return DataExtractor(type('TestConfig', (ScrapingConfig,), {'ANALYSIS_CACHE_SIZE': cache_size, **settings})())
+
+def test_cached_records_match_uncached():
+    # Pages seen twice, as stickies and quoted posts are, with a small cache that evicts
+    pages = [listing_page(1), listing_page(1), listing_page(2), listing_page(3), listing_page(2)]
+    cached = make_extractor(45)
+    uncached = make_extractor(0)
+
+    for page in pages:
+        assert comparable(cached.extract_page_data(page, SECTION)) == \
+            comparable(uncached.extract_page_data(page, SECTION))
+    stats = cached.analysis_cache.stats()
+    assert stats['hits'] and stats['misses'] and stats['entries'] == 45
+    assert uncached.analysis_cache.stats()['hits'] == 0
+
+def test_returned_analysis_is_a_copy():
+    extractor = make_extractor(10)
+    post = {'content': 'Can anyone recommend a book or a website? I am worried.'}
+    first = extractor._cached_analysis(dict(post))
+    first['resource_mentions'].append('changed')
+    first['keywords'].clear()
+
+    assert extractor._cached_analysis(dict(post)) == make_extractor(0)._cached_analysis(dict(post))
+    assert extractor.analysis_cache.hits == 1
+
+def test_pattern_change_invalidates_entries():
+    extractor = make_extractor(10)
+    post = {'content': 'We went to the clinic and the doctor was great'}
+    before = extractor._cached_analysis(dict(post))
+    extractor.patterns.register('resource_mentions', 'clinic')
+    after = extractor._cached_analysis(dict(post))
+
+    assert 'clinic' not in before['resource_mentions'] and 'clinic' in after['resource_mentions']
+    assert after['analyzed_with'] == extractor.patterns.fingerprint != before['analyzed_with']
+    assert extractor.analysis_cache.stats()['invalidations'] == 1
+    assert extractor.analysis_cache.hits == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnalysisCache(2)
+    for content in ('a', 'b'):
+        assert cache.get(content, 'patterns') is None
+        cache.put(content, 'patterns', {'keywords': [content]})
+    assert cache.get('a', 'patterns') == {'keywords': ['a']}
+    cache.put('c', 'patterns', {'keywords': ['c']})
+
+    assert cache.get('b', 'patterns') is None
+    assert cache.get('a', 'patterns') == {'keywords': ['a']}
+    assert cache.get('c', 'patterns') == {'keywords': ['c']}
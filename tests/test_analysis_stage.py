@@ -0,0 +1,28 @@
+"""
+Inline and deferred content analysis must give the same analyzed posts
+"""
+import pytest
+
+from config import ScrapingConfig
+from data_extractor import DataExtractor
+from sample_pages import comparable, listing_page
+
+SECTION = 'general_discussion'
+
+def make_config(**settings):
+    return type('TestConfig', (ScrapingConfig,), settings)()
+
+def test_deferred_analysis_matches_inline():
+    inline = DataExtractor(make_config(ANALYSIS_MODE='inline')).extract_page_data(listing_page(1), SECTION)
+    extractor = DataExtractor(make_config(ANALYSIS_MODE='deferred'))
+    deferred = extractor.extract_page_data(listing_page(1), SECTION)
+
+    assert all(post['analyzed_with'] is None for post in deferred)
+    assert extractor.analyze_posts(deferred) == len(deferred)
+    assert comparable(deferred) == comparable(inline)
+    # Already analyzed with the current patterns
+    assert extractor.analyze_posts(deferred) == 0
+
+def test_unknown_analysis_mode_is_rejected():
+    with pytest.raises(ValueError, match='ANALYSIS_MODE'):
+        DataExtractor(make_config(ANALYSIS_MODE='lazy'))
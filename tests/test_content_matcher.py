@@ -0,0 +1,102 @@
+"""
+CategoryMatcher must find what searching each pattern on its own finds
+"""
+import re
+
+import pytest
+
+from benchmarks import analyze_with_raw_patterns, build_sample_posts, build_worst_case_posts
+from config import ScrapingConfig
+from data_extractor import DataExtractor
+from patterns import WORD_GROUPS, PatternRegistry
+from tokenization import normalize
+
+# Overlapping and contained phrases, enough of them for the trie scanner,
+# real regular expressions and a word-group literal with punctuation
+CUSTOM_PATTERNS = {
+    'answer_indicators': [
+        'in my', 'my experience', 'experience with', 'what worked', 'worked for me', 'for me it',
+        'it was', 'was fine', 'had the same', 'same thing', 'thing happened', 'happened to me',
+        'to me too', 'me too', 'hatzlacha', r'b"h', 'good luck'
+    ],
+    'question_indicators': [r'\banyone\b', r'does (any|some)one know', 'is it normal'],
+    'emotional_indicators': [r'exhaust(ed|ing)', 'over the moon'],
+    'resource_mentions': ['e-book', r'clinic\w?', 'camp']
+}
+
+EDGE_CASES = [
+    '', '?', 'HOW TO get help???', 'In my experience with this, what worked for me it was fine',
+    'I had the same thing happened to me too, me too!', 'to me tooth', 'my experienc', 'in myexperience',
+    'Here\'s what I did: ask the DOCTOR and read the Handbook, the e-book and ebooks',
+    'Café owners recommended an ÉTUDE app; the apps/applications and toolkits helped',
+    'does anyone know... does someone know? anyone? Anyone!', 'we were exhausted and exhausting, over the moon',
+    'B"H all well. Hatzlacha and good luck, the clinics and clinic2 and camps', 'bookbookbook websiteproduct'
+]
+
+def registries():
+    return {'default': PatternRegistry(), 'custom': PatternRegistry(CUSTOM_PATTERNS)}
+
+def reference_scan(registry: PatternRegistry, text: str):
+    """Patterns and words matched by searching each compiled pattern on its own"""
+    patterns, words = {}, {}
+    for group in registry.compiled:
+        for raw, compiled in registry.group(group):
+            found = {match.group() for match in compiled.finditer(text)}
+            if found or compiled.search(text):
+                patterns.setdefault(group, set()).add(raw)
+                if group in WORD_GROUPS:
+                    words.setdefault(group, set()).update(found)
+    return patterns, words
+
+@pytest.mark.parametrize('name', ['default', 'custom'])
+def test_scan_matches_each_pattern_searched(name):
+    registry = registries()[name]
+    # Enough phrases in the custom registry for the trie scanner
+    assert (registry.matcher.scanner is not None) == (name == 'custom')
+    for text in EDGE_CASES + build_sample_posts(300):
+        patterns, words = reference_scan(registry, text)
+        lowered = {group: {word.lower() for word in found} for group, found in words.items()}
+        text_form = normalize(text)
+        # On the text itself, and as the extractor calls it, on lowercased text and its tokens
+        for result, expected_words in ((registry.matcher.scan(text), words),
+                                       (registry.matcher.scan(text_form.content, text_form.words), lowered)):
+            for group in registry.compiled:
+                assert result.matched(group) == patterns.get(group, set()), (group, text)
+            for group in WORD_GROUPS:
+                assert result.mentions(group) == expected_words.get(group, set()), (group, text)
+
+@pytest.mark.parametrize('name', ['default', 'custom'])
+def test_analysis_matches_raw_patterns(name):
+    config = type('TestConfig', (ScrapingConfig,), {'CUSTOM_PATTERNS': CUSTOM_PATTERNS if name == 'custom' else {}})()
+    extractor = DataExtractor(config)
+    for content in EDGE_CASES + build_sample_posts(300):
+        expected = analyze_with_raw_patterns(extractor.patterns.raw, content)
+        analysis = extractor._analyze_content(content)
+        assert analysis['is_question'] == bool(expected['is_question']), content
+        assert analysis['is_answer'] == bool(expected['is_answer']), content
+        assert analysis['sentiment_indicators'] == expected['sentiment_indicators'], content
+        assert sorted(analysis['resource_mentions']) == sorted(expected['resource_mentions']), content
+
+# Words around, inside and across stems: digits, underscores, accents, repeats
+MENTION_CASES = [
+    'bookstore BOOKS e-books ebook_reader book2 2book _book_ Büchbook bookbook',
+    'the doctors/specialists said: apps, applications, happy (app) toolbox, toolkit',
+    'https://www.amazon.com/dp/book?ref=website_product&tool=1',
+    'servicesproductresource', 'boo bo ok b ook', 'appp a pp'
+]
+
+def stem_regex_mentions(stems, content: str) -> set:
+    """Resource mentions as found before tokenization, one regex per stem"""
+    return {match.group() for stem in stems for match in re.finditer(rf'\b\w*{stem}\w*\b', content, re.IGNORECASE)}
+
+@pytest.mark.parametrize('name', ['default', 'custom'])
+def test_mentions_match_stem_regexes(name):
+    registry = registries()[name]
+    stems = registry['resource_mentions']
+    texts = MENTION_CASES + EDGE_CASES + build_sample_posts(200) + list(build_worst_case_posts(3000).values())
+    for text in texts:
+        assert registry.matcher.mentions(text, 'resource_mentions') == stem_regex_mentions(stems, text), text
+        # As the extractor calls it, with the tokens of the lowercased text
+        text_form = normalize(text)
+        assert registry.matcher.mentions(text_form.content, 'resource_mentions', text_form.words) == \
+            stem_regex_mentions(stems, text_form.content), text
@@ -0,0 +1,21 @@
+"""
+Time window bucketing of post timestamps
+"""
+import pytest
+
+from keyword_engine import time_window
+
+@pytest.mark.parametrize('timestamp, window, label', [
+    ('2024-01-05T10:30:00', 'month', '2024-01'),
+    ('2024-01-05T10:30:00', 'year', '2024'),
+    ('2024-01-05', 'day', '2024-01-05'),
+    ('2024-01-05 10:30', 'month', '2024-01')
+])
+def test_iso_timestamps_are_bucketed(timestamp, window, label):
+    assert time_window(timestamp, window) == label
+
+@pytest.mark.parametrize('timestamp', [
+    'Mon Jan 01, 2024', 'yesterday at 5pm', '01/05/2024', '2024-13-01', '2024', '', None
+])
+def test_other_timestamps_have_no_window(timestamp):
+    assert time_window(timestamp) is None
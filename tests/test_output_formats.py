@@ -0,0 +1,98 @@
+"""
+Every output format of a scrape must hold the same posts with the same fields
+"""
+import json
+import os
+
+import pytest
+
+from config import ScrapingConfig
+from main import finish_inline_analysis
+from scraper import ImamotherScraper
+from storage import POST_COLUMNS, JsonLinesSection, iter_jsonl, read_csv_posts
+from utils import generate_summary_stats, validate_scraped_data
+from sample_pages import listing_page
+
+SECTIONS = ['pregnancy_childbirth', 'general_discussion']
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+@pytest.fixture
+def make_config(tmp_path):
+    def make(**settings):
+        settings = {'OUTPUT_DIR': str(tmp_path), 'LOG_FILE': str(tmp_path / 'scraper.log'),
+                    'ARCHIVE_PAGES': False, 'REQUEST_DELAY': 0, **settings}
+        return type('TestConfig', (ScrapingConfig,), settings)()
+    return make
+
+def scrape(config, monkeypatch):
+    """Scrape one page per section from canned pages and save the run"""
+    with ImamotherScraper(config) as scraper:
+        scraper.session_active = True
+        pages = {section: listing_page(seed) for seed, section in enumerate(SECTIONS, 1)}
+        monkeypatch.setattr(scraper, '_make_request',
+                            lambda url, **kwargs: FakeResponse(next(page for section, page in pages.items()
+                                                                    if config.FORUM_SECTIONS[section] in url)))
+        data = {section: scraper.scrape_section(section, max_pages=1) for section in SECTIONS}
+        finish_inline_analysis(scraper, data)
+        scraper.save_data(data, 'test')
+    return data
+
+def saved_file(config, extension: str, section: str = '') -> str:
+    """The one file of the run with the extension, of the section when given"""
+    names = [name for name in os.listdir(config.OUTPUT_DIR) if name.startswith(('test_', 'imamother_scrape_'))
+             and name.endswith(extension) and (not section or f'_{section}_' in name)]
+    assert len(names) == 1, names
+    return os.path.join(config.OUTPUT_DIR, names[0])
+
+@pytest.mark.parametrize('settings', [
+    {},
+    {'KEYWORD_SCORING': 'tfidf'},
+    {'KEYWORD_SCORING': 'tfidf', 'ANALYZE_SENTIMENT': True}
+])
+def test_jsonl_matches_json(make_config, monkeypatch, settings):
+    config = make_config(OUTPUT_FORMATS=['jsonl', 'json'], **settings)
+    scrape(config, monkeypatch)
+
+    with open(saved_file(config, '.json'), encoding='utf-8') as f:
+        expected = [post for posts in json.load(f).values() for post in posts]
+    records = list(iter_jsonl(saved_file(config, '.jsonl')))
+
+    assert expected
+    assert [sorted(record) for record in records] == [sorted(post) for post in expected]
+    assert records == expected
+
+@pytest.mark.parametrize('settings', [
+    {},
+    {'KEYWORD_SCORING': 'tfidf', 'ANALYZE_SENTIMENT': True}
+])
+def test_csv_matches_json(make_config, monkeypatch, settings):
+    config = make_config(OUTPUT_FORMATS=['csv', 'json'], **settings)
+    scrape(config, monkeypatch)
+
+    with open(saved_file(config, '.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    for section in SECTIONS:
+        rows = read_csv_posts(saved_file(config, '.csv', section))
+        posts = [{name: post.get(name) for name, _ in POST_COLUMNS} for post in expected[section]]
+        assert rows == posts
+
+def test_streamed_posts_are_not_kept(make_config, monkeypatch):
+    config = make_config(OUTPUT_FORMATS=['jsonl', 'csv'])
+    data = scrape(config, monkeypatch)
+    records = list(iter_jsonl(saved_file(config, '.jsonl')))
+
+    assert all(isinstance(posts, JsonLinesSection) for posts in data.values())
+    assert sum(len(posts) for posts in data.values()) == len(records)
+    assert [post for section in SECTIONS for post in data[section]] == records
+
+def test_streamed_posts_give_the_same_summary(make_config, monkeypatch, tmp_path):
+    streamed = scrape(make_config(OUTPUT_FORMATS=['jsonl']), monkeypatch)
+    config = make_config(OUTPUT_FORMATS=['jsonl', 'json'], OUTPUT_DIR=str(tmp_path / 'kept'))
+    kept = scrape(config, monkeypatch)
+
+    assert all(isinstance(posts, list) for posts in kept.values())
+    assert generate_summary_stats(streamed) == generate_summary_stats(kept)
+    assert validate_scraped_data(streamed) == validate_scraped_data(kept)
@@ -0,0 +1,70 @@
+"""
+Pages read back through the offset index must be the pages archived
+"""
+import gzip
+import os
+
+from data_extractor import DataExtractor
+from page_archive import INDEX_FILE, PageArchive
+from sample_pages import FIXTURES, comparable
+
+SECTION = 'general_discussion'
+
+def archive_fixtures(directory: str) -> list:
+    """Archive every fixture page, returning (url, content) in archive order"""
+    pages = [(f'https://www.imamother.com/forum/{name}?page=1', content) for name, content in FIXTURES.items()]
+    # A body holding the record separator and no markup at all
+    pages.append(('https://www.imamother.com/forum/raw', b'\r\n\r\nnot html\r\n\r\n\x00\xff'))
+    with PageArchive(directory) as archive:
+        for url, content in pages:
+            archive.append(url, SECTION, content)
+    return pages
+
+def test_offsets_read_back_each_page(tmp_path):
+    pages = archive_fixtures(str(tmp_path))
+
+    archive = PageArchive(str(tmp_path))
+    entries = list(archive.entries())
+    assert [entry['url'] for entry in entries] == [url for url, _ in pages]
+    assert [archive.read(entry) for entry in entries] == [content for _, content in pages]
+
+def test_archive_file_is_one_gzip_member_per_record(tmp_path):
+    pages = archive_fixtures(str(tmp_path))
+    entries = list(PageArchive(str(tmp_path)).entries())
+
+    # Read sequentially, without the index, the file is every record in order
+    with open(tmp_path / entries[0]['file'], 'rb') as f:
+        records = gzip.decompress(f.read())
+    assert entries[-1]['offset'] + entries[-1]['length'] == os.path.getsize(tmp_path / entries[0]['file'])
+    position = 0
+    for _, content in pages:
+        position = records.index(content, position) + len(content)
+
+def test_latest_fetch_of_a_url_is_read(tmp_path):
+    url = 'https://www.imamother.com/forum/married-life?page=1'
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(url, 'married_life', b'first fetch')
+        archive.append('https://www.imamother.com/forum/other', 'general_discussion', b'other')
+        archive.append(url, 'married_life', b'second fetch')
+
+    archive = PageArchive(str(tmp_path))
+    assert archive.read(archive.lookup(url)) == b'second fetch'
+    assert [content for _, content in archive.iter_pages(['married_life'], latest=True)] == [b'second fetch']
+    assert [content for _, content in archive.iter_pages(['married_life'])] == [b'first fetch', b'second fetch']
+
+def test_malformed_index_lines_are_skipped(tmp_path):
+    pages = archive_fixtures(str(tmp_path))
+    with open(tmp_path / INDEX_FILE, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://www.imamother.com/cut-off", "sec')
+
+    assert [content for _, content in PageArchive(str(tmp_path)).iter_pages()] == [content for _, content in pages]
+
+def test_reextraction_matches_extraction(tmp_path):
+    archive_fixtures(str(tmp_path))
+    extractor = DataExtractor()
+    archived = [page_data for page_data in extractor.extract_many(
+        ((content, entry['section']) for entry, content in PageArchive(str(tmp_path)).iter_pages()), workers=1)]
+
+    fresh = DataExtractor()
+    expected = [fresh.extract_page_data(content, SECTION) for content in FIXTURES.values()] + [[]]
+    assert [comparable(records) for records in archived] == [comparable(records) for records in expected]
@@ -0,0 +1,41 @@
+"""
+Partial parsing must give the same records as a full parse of the page
+"""
+import pytest
+
+from config import ScrapingConfig
+from data_extractor import DataExtractor
+from sample_pages import FIXTURES, comparable
+
+SECTION = 'general_discussion'
+
+def make_config(**settings):
+    return type('TestConfig', (ScrapingConfig,), settings)()
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('name', list(FIXTURES))
+def test_learned_selector_matches_full_parse(name, backend):
+    page = FIXTURES[name]
+    full = DataExtractor(make_config(PARSER_BACKEND=backend))
+    expected = full.extract_page_data(page, SECTION)
+    assert expected
+
+    # Start from the selector the full parse learned, as a crawl would after its first page
+    partial = DataExtractor(make_config(PARSER_BACKEND=backend, PARTIAL_PARSE=True))
+    partial.selector_plan = {section: dict(plan) for section, plan in full.selector_plan.items()}
+    assert partial._find_posts_partial(page, SECTION)
+    assert comparable(partial.extract_page_data(page, SECTION)) == comparable(expected)
+
+@pytest.mark.parametrize('settings', [
+    {'PARTIAL_PARSE_CLASSES': ['post']},
+    {'PARTIAL_PARSE_TAGS': ['div'], 'PARTIAL_PARSE_CLASSES': ['post']},
+    {'PARTIAL_PARSE_TAGS': ['body']}
+])
+@pytest.mark.parametrize('name', list(FIXTURES))
+def test_configured_containers_match_full_parse(name, settings):
+    page = FIXTURES[name]
+    expected = DataExtractor().extract_page_data(page, SECTION)
+
+    partial = DataExtractor(make_config(PARTIAL_PARSE=True, **settings))
+    assert partial._find_posts_partial(page, SECTION)
+    assert comparable(partial.extract_page_data(page, SECTION)) == comparable(expected)
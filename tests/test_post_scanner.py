@@ -0,0 +1,89 @@
+"""
+PostScan and summarize_subtrees must find what BeautifulSoup's own searches find
+"""
+import pytest
+from bs4 import BeautifulSoup
+
+from data_extractor import DataExtractor
+from patterns import NOISE_CLASS_PATTERN, POST_ID_PATTERN, POST_MARKER_PATTERNS
+from post_scanner import FIELD_SELECTORS, PostScan, SubtreeSummary, summarize_subtrees
+from sample_pages import listing_page, nested_page
+
+PAGES = {
+    'listing': listing_page(1),
+    'nested': nested_page(),
+    # Fields under several matching classes, uppercase tags and repeated selectors
+    'mixed': (
+        b'<html><body><div class="post message-row" id="message-7">'
+        b'<div class="user-info author"><span class="username">ann</span></div>'
+        b'<H2>Heading</H2><h3 class="topic-title">Title</h3>'
+        b'<div class="message-content body"><p>text <span class="date">today</span></p>'
+        b'<div class="quoted-text">quoted</div><div class="sig">sig</div></div>'
+        b'<a href="/a">a</a><a name="anchor">no href</a>'
+        b'<span class="tag">one</span><span class="tags category">two</span>'
+        b'<span class="reply-count">3 replies</span><span class="view-count">9 views</span>'
+        b'</div></body></html>'
+    ),
+    # No post classes: posts are only found by the fallback
+    'classless': (
+        b'<html><body><section><article><span class="user">m1</span><span class="when">x</span>'
+        b'<div>  a post   without any of the usual classes, long enough to count as one  </div></article>'
+        b'<article><!-- a comment --><script>var hidden = "script text is not post text";</script>'
+        b'<div class="post-date">yesterday</div><pre>  preformatted\n  text of the second post, which is long  </pre>'
+        b'</article><div class="wrap">' + b'<div class="wrap">words of a deeply nested layout ' * 30
+        + b'</div>' * 31 + b'</section></body></html>'
+    )
+}
+
+FALLBACK_NAMES = ['div', 'article', 'section']
+
+def roots(page: bytes, backend: str):
+    """Every div of the page, so posts and containers of posts are both scanned"""
+    return BeautifulSoup(page, backend).find_all('div')
+
+@pytest.mark.parametrize('learned', [(), ('author', 'content')])
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('name', list(PAGES))
+def test_fields_match_select(name, backend, learned):
+    for root in roots(PAGES[name], backend):
+        # Fields with a learned path are only indexed when their cascade is asked for
+        scan = PostScan(root, {field: None for field in learned})
+        for field, selectors in FIELD_SELECTORS.items():
+            for position, selector in enumerate(selectors):
+                assert scan.first(field, position) is root.select_one(selector), (field, selector)
+                assert scan.all(field, position) == root.select(selector), (field, selector)
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('name', list(PAGES))
+def test_collected_elements_match_find_all(name, backend):
+    for root in roots(PAGES[name], backend):
+        scan = PostScan(root)
+        assert scan.links == root.find_all('a', href=True)
+        assert scan.id_elements == root.find_all(id=POST_ID_PATTERN)
+        assert scan.noise_within(root) == root.find_all(class_=NOISE_CLASS_PATTERN)
+
+def reference_summary(element) -> SubtreeSummary:
+    """What the fallback read from each element before the bottom-up pass"""
+    text = element.get_text()
+    return SubtreeSummary(len(text.strip()), len(text.strip().split()),
+                          {name: element.find(class_=pattern) is not None
+                           for name, pattern in POST_MARKER_PATTERNS.items()})
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser'])
+@pytest.mark.parametrize('name', list(PAGES))
+def test_subtree_summaries_match_get_text(name, backend):
+    soup = BeautifulSoup(PAGES[name], backend)
+    summaries = summarize_subtrees(soup, FALLBACK_NAMES, POST_MARKER_PATTERNS)
+
+    assert [element for element, _ in summaries] == soup.find_all(FALLBACK_NAMES)
+    for element, summary in summaries:
+        assert summary == reference_summary(element)
+
+@pytest.mark.parametrize('name', list(PAGES))
+def test_fallback_finds_the_same_posts(name):
+    extractor = DataExtractor()
+    soup = BeautifulSoup(PAGES[name], extractor.parser_backend)
+    expected = [element for element in soup.find_all(FALLBACK_NAMES)
+                if extractor._looks_like_post(reference_summary(element))]
+
+    assert extractor._find_posts_fallback(soup) == expected
@@ -0,0 +1,82 @@
+"""
+SQLite post store: upserts, the full-text index and reading it back
+"""
+import json
+
+from business_analyzer import BusinessIntelligenceAnalyzer
+from data_extractor import DataExtractor
+from storage import PostStore
+from tokenization import public_record
+from sample_pages import listing_page
+
+SECTION = 'general_discussion'
+
+def extracted_posts(seed: int = 1):
+    return [public_record(post) for post in DataExtractor().extract_page_data(listing_page(seed), SECTION)]
+
+def test_analyzer_reads_the_store_like_json(tmp_path):
+    posts = extracted_posts()
+    with PostStore(str(tmp_path / 'posts.db')) as store:
+        store.write(posts)
+    with open(tmp_path / 'posts.json', 'w', encoding='utf-8') as f:
+        json.dump({SECTION: posts}, f)
+
+    from_store = BusinessIntelligenceAnalyzer()
+    assert from_store.load_data(str(tmp_path / 'posts.db'))
+    # Read and closed; keyword scans reopen it for their query only
+    assert from_store.store._connection is None
+    from_json = BusinessIntelligenceAnalyzer()
+    assert from_json.load_data(str(tmp_path / 'posts.json'))
+
+    assert from_store.analyze_market_opportunities() == from_json.analyze_market_opportunities()
+    assert from_store.store._connection is None
+
+def stored(store):
+    return {(post['section'], post['post_id']): post for post in store.iter_posts()}
+
+def test_writing_again_updates_rows(tmp_path):
+    posts = extracted_posts()
+    with PostStore(str(tmp_path / 'posts.db')) as store:
+        store.write(posts)
+        rowids = {key: post['rowid'] for key, post in stored(store).items()}
+
+        changed = [dict(post, content='rewritten zeppelin post', replies_count=99) for post in posts[:5]]
+        store.write(changed + posts[5:])
+        # The same post id in another section is another post
+        store.write([dict(posts[0], section='married_life')])
+
+        rows = stored(store)
+        assert len(rows) == len(posts) + 1
+        assert {key: rows[key]['rowid'] for key in rowids} == rowids
+        for post in changed:
+            row = rows[(SECTION, post['post_id'])]
+            assert (row['content'], row['replies_count']) == ('rewritten zeppelin post', 99)
+        # The index follows updates: old content is gone, new content found
+        assert store.matching(['zeppelin']) == {rowids[(SECTION, post['post_id'])] for post in changed}
+        assert not store.matching([posts[0]['content'][:40]]) & {rowids[(SECTION, posts[0]['post_id'])]}
+
+def test_posts_without_id_are_keyed_on_content(tmp_path):
+    posts = [dict(post, post_id=None) for post in extracted_posts()[:4]]
+    with PostStore(str(tmp_path / 'posts.db')) as store:
+        store.write(posts)
+        store.write([dict(posts[0], replies_count=7), dict(posts[1], content=posts[1]['content'] + ' edited')])
+        rows = list(store.iter_posts())
+        assert len(rows) == 5
+        assert [row['replies_count'] for row in rows if row['content'] == posts[0]['content']] == [7]
+
+# Terms of three or more characters: cased, multi-word, punctuated, quoted
+TERMS = [['sleep'], ['BOOK', 'website'], ['how to'], ['camp', 'zzz-not-there'], ['"quoted"'],
+         ['help?'], ['Café'], ['thread about']]
+
+def test_matching_equals_substring_search(tmp_path):
+    posts = extracted_posts(1) + extracted_posts(2)
+    posts[0]['content'] += ' how to find a "quoted" café? help?'
+    posts[1]['title'] = 'CAFÉ thread about Help?'
+    with PostStore(str(tmp_path / 'posts.db')) as store:
+        store.write(posts)
+        rows = list(store.iter_posts(['title', 'content']))
+        for terms in TERMS:
+            for column in ('content', 'title'):
+                expected = {row['rowid'] for row in rows
+                            if any(term.lower() in (row[column] or '').lower() for term in terms)}
+                assert store.matching(terms, column) == expected, (terms, column)
@@ -0,0 +1,133 @@
+"""
+Post files: CSV writing, compressed files and reading back
+"""
+import gzip
+import json
+import lzma
+
+import pytest
+
+try:
+    import zstandard
+except ImportError:  # zstd cases run only where it is installed
+    zstandard = None
+
+from data_extractor import DataExtractor
+from storage import (POST_COLUMNS, CsvPostWriter, JsonLinesSink, compressed_path, compression_of, data_format,
+                     iter_jsonl, load_posts, open_data, read_csv_posts)
+from tokenization import public_record
+from sample_pages import listing_page
+
+SECTION = 'general_discussion'
+
+def extracted_posts(seed: int = 1):
+    return [public_record(post) for post in DataExtractor().extract_page_data(listing_page(seed), SECTION)]
+
+def schema_fields(posts):
+    return [{name: post.get(name) for name, _ in POST_COLUMNS} for post in posts]
+
+@pytest.mark.parametrize('codec', [None, 'gzip'])
+def test_csv_writer_appends_after_close(tmp_path, codec):
+    first, second = extracted_posts(1), extracted_posts(2)
+    writer = CsvPostWriter(compressed_path(str(tmp_path / 'section.csv'), codec))
+    writer.write(first)
+    writer.close()
+    # The same section scraped again in the run, e.g. after a retry
+    writer.write(second)
+    writer.close()
+
+    assert writer.records_written == len(first) + len(second)
+    assert read_csv_posts(writer.path) == schema_fields(first + second)
+
+def test_csv_rewrite_replaces_records(tmp_path):
+    writer = CsvPostWriter(str(tmp_path / 'section.csv'))
+    writer.write(extracted_posts(1))
+    writer.close()
+    posts = extracted_posts(2)
+    writer.rewrite(posts)
+    writer.close()
+
+    assert writer.records_written == len(posts)
+    assert read_csv_posts(writer.path) == schema_fields(posts)
+
+def _zstd_frames(data: bytes) -> bytes:
+    output = []
+    while data:
+        frame = zstandard.ZstdDecompressor().decompressobj()
+        output.append(frame.decompress(data))
+        data = frame.unused_data
+    return b''.join(output)
+
+# Each codec's own decompressor, reading every gzip member, xz stream and zstd frame
+DECOMPRESS = {
+    None: lambda data: data,
+    'gzip': gzip.decompress,
+    'xz': lzma.decompress,
+    'zstd': _zstd_frames
+}
+CODECS = [codec for codec in DECOMPRESS if codec != 'zstd' or zstandard is not None]
+
+def test_paths_name_their_codec():
+    assert compressed_path('out/data.json', None) == 'out/data.json'
+    for codec, extension in (('gzip', '.gz'), ('xz', '.xz'), ('zstd', '.zst')):
+        path = compressed_path('out/data.jsonl', codec)
+        assert path == 'out/data.jsonl' + extension
+        assert (compression_of(path), data_format(path)) == (codec, '.jsonl')
+    assert (compression_of('data.json'), data_format('data.json')) == (None, '.json')
+    assert data_format('posts.db') == '.db'
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_open_data_round_trips_through_codec(tmp_path, codec):
+    path = compressed_path(str(tmp_path / 'data.txt'), codec)
+    # Non-ASCII text, written, then appended as a second member/stream/frame
+    first, second = 'Café — שלום\n' * 200, 'second write\r\n'
+    with open_data(path, 'w') as f:
+        f.write(first)
+    with open_data(path, 'a', newline='') as f:
+        f.write(second)
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    assert DECOMPRESS[codec](raw).decode('utf-8') == first + second
+    with open_data(path, newline='') as f:
+        assert f.read() == first + second
+    if codec:
+        assert len(raw) < len((first + second).encode('utf-8'))
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_compressed_posts_load_like_plain_files(tmp_path, codec):
+    posts = extracted_posts(1) + [dict(post, section='married_life') for post in extracted_posts(2)]
+    expected = load_posts(_write_json(str(tmp_path / 'plain.json'), posts))
+
+    json_path = _write_json(compressed_path(str(tmp_path / 'data.json'), codec), posts)
+    jsonl_path = compressed_path(str(tmp_path / 'data.jsonl'), codec)
+    with JsonLinesSink(jsonl_path) as sink:
+        sink.write(posts[:10])
+    # A later write appends, as a resumed run does
+    with JsonLinesSink(jsonl_path) as sink:
+        sink.write(posts[10:])
+
+    assert load_posts(json_path) == expected
+    assert load_posts(jsonl_path) == expected
+    assert set(expected) == {SECTION, 'married_life'}
+
+# xz streams are only readable once closed, as the README says
+@pytest.mark.parametrize('codec', [codec for codec in CODECS if codec != 'xz'])
+def test_flushed_pages_read_before_close(tmp_path, codec):
+    sink = JsonLinesSink(compressed_path(str(tmp_path / 'data.jsonl'), codec))
+    posts = extracted_posts(1)
+    sink.write(posts[:10])
+    sink.write(posts[10:])
+    try:
+        # An interrupted run: every flushed page is readable
+        assert [record['post_id'] for record in iter_jsonl(sink.path)] == [post['post_id'] for post in posts]
+    finally:
+        sink.close()
+
+def _write_json(path, posts):
+    data = {}
+    for post in posts:
+        data.setdefault(post['section'], []).append(post)
+    with open_data(path, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
@@ -0,0 +1,31 @@
+"""
+StreamingDataExtractor must give the same records as DataExtractor's full parse
+"""
+import pytest
+
+pytest.importorskip('lxml')
+
+from data_extractor import DataExtractor, StreamingDataExtractor
+from sample_pages import FIXTURES, comparable
+
+SECTION = 'general_discussion'
+CHUNK_SIZE = 97
+
+@pytest.mark.parametrize('mode', ['whole', 'chunked'])
+@pytest.mark.parametrize('name', list(FIXTURES))
+def test_streaming_matches_dom(name, mode):
+    page = FIXTURES[name]
+    dom = DataExtractor()
+    expected = dom.extract_page_data(page, SECTION)
+    assert expected
+
+    # Start from the selector the full parse learned, as a crawl would after its first page
+    streaming = StreamingDataExtractor()
+    streaming.selector_plan = {section: dict(plan) for section, plan in dom.selector_plan.items()}
+    if mode == 'whole':
+        records = streaming.extract_page_data(page, SECTION)
+    else:
+        chunks = [page[i:i + CHUNK_SIZE] for i in range(0, len(page), CHUNK_SIZE)]
+        records = list(streaming.iter_page_data(chunks, SECTION))
+
+    assert comparable(records) == comparable(expected)
@@ -0,0 +1,102 @@
+"""
+The compiled taxonomy must score posts as one `in` test per keyword does
+"""
+import json
+
+import pytest
+
+from benchmarks import build_sample_posts
+from taxonomy import DEFAULT_TAXONOMY, Taxonomy, get_taxonomy
+from tokenization import normalize, tokenize
+from utils import categorize_business_opportunity
+
+# Keywords inside other words, across the content/title boundary, shared
+# between categories (support), multi-word and tied scores
+EDGE_CASES = [
+    ('', ''), ('?', ''), ('HOW TO find the BEST brand', ''), ('bestow a rebooking', 'unsupported'),
+    ('how', 'to get help'), ('support group', ''), ('we meet to share', 'a guide and a book'),
+    ('where to find a product review', 'comparison of quality'), ('servicesproductresource', ''),
+    ('what is the price at target, walmart or amazon?', ''), ('ask a doctor or a tutor', 'local club event'),
+    ('Café information — learn/understand; explain!', 'tutorial'), ('similar experience together', 'connect')
+]
+
+# Terms with punctuation, repeated and differently cased, and overlapping terms
+CUSTOM_TAXONOMY = {
+    'categories': {
+        'childcare': {'keywords': ['baby-sitter', 'nanny', 'Nanny', 'day care', 'care'],
+                      'related': ['au pair', 'c++ tutor']},
+        'health': {'keywords': ['dr.', 'care', 'clinic'], 'related': ['(ob/gyn)']}
+    },
+    'section_categories': [{'sections': ['kids'], 'category': 'family_service'}],
+    'default_category': 'other'
+}
+CUSTOM_CASES = [
+    ('our Nanny and baby-sitter', ''), ('day care or the clinic', ''), ('dr. smith, (OB/GYN)', ''),
+    ('drs said', 'c++ tutoring'), ('au pairs', ''), ('careful', 'daycare'), ('nothing here', '')
+]
+
+def reference_categorize(definition, content: str, title: str, section: str = '') -> str:
+    """Category as scored before the taxonomy was compiled, one `in` test per keyword"""
+    text = f"{content.lower()} {title.lower()}"
+    scores = {name: sum(1 for keyword in dict.fromkeys(term.lower() for term in terms.get('keywords', []))
+                        if keyword in text)
+              for name, terms in definition['categories'].items()}
+    best = max(scores, key=scores.get)
+    if scores[best] > 0:
+        return best
+    for rule in definition.get('section_categories', []):
+        if any(word in section for word in rule['sections']):
+            return rule['category']
+    return definition.get('default_category', 'general')
+
+def reference_mentioned(definition, content: str) -> set:
+    """Categories with any keyword or related term in the lowercased content"""
+    text = content.lower()
+    return {name for name, terms in definition['categories'].items()
+            if any(term.lower() in text for term in terms.get('keywords', []) + terms.get('related', []))}
+
+def cases(name):
+    if name == 'default':
+        return DEFAULT_TAXONOMY, EDGE_CASES + [(post, 'Thread about sleep') for post in build_sample_posts(300)]
+    return CUSTOM_TAXONOMY, CUSTOM_CASES + EDGE_CASES
+
+@pytest.mark.parametrize('name', ['default', 'custom'])
+def test_categorize_matches_keyword_loop(name):
+    definition, texts = cases(name)
+    taxonomy = Taxonomy(definition)
+    for content, title in texts:
+        text = normalize(content, title)
+        for section in ('', 'pregnancy_and_childbirth', 'married_life', 'kids_corner', 'general'):
+            expected = reference_categorize(definition, content, title, section)
+            # On the text alone, and as the summary calls it, with its tokens
+            assert taxonomy.categorize(text.combined, section) == expected, (content, title, section)
+            assert taxonomy.categorize(text.combined, section, text.words + tokenize(text.title)) == expected, \
+                (content, title, section)
+
+@pytest.mark.parametrize('name', ['default', 'custom'])
+def test_mentioned_matches_term_loop(name):
+    definition, texts = cases(name)
+    taxonomy = Taxonomy(definition)
+    for content, _ in texts:
+        text = normalize(content)
+        expected = reference_mentioned(definition, content)
+        assert taxonomy.mentioned(text.content) == expected, content
+        assert taxonomy.mentioned(text.content, text.words) == expected, content
+
+def test_summary_categorization_uses_default_taxonomy():
+    for content, title in EDGE_CASES:
+        record = {'content': content, 'title': title, 'section': 'pregnancy'}
+        assert categorize_business_opportunity(record) == \
+            reference_categorize(DEFAULT_TAXONOMY, content, title, 'pregnancy'), (content, title)
+
+def test_taxonomy_file_is_loaded(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps(CUSTOM_TAXONOMY), encoding='utf-8')
+    taxonomy = get_taxonomy(str(path))
+    try:
+        assert set(taxonomy.categories) == {'childcare', 'health'}
+        assert taxonomy.categorize('nothing here', 'kids') == 'family_service'
+        # A missing file falls back to the default taxonomy
+        assert set(get_taxonomy(str(tmp_path / 'missing.json')).categories) == set(DEFAULT_TAXONOMY['categories'])
+    finally:
+        get_taxonomy(None)
@@ -0,0 +1,34 @@
+"""
+Each post's text is normalized once and shared by every later stage
+"""
+import data_extractor
+import tokenization
+from config import ScrapingConfig
+from data_extractor import DataExtractor
+from tokenization import TEXT_KEY, normalize, public_record
+from utils import generate_summary_stats
+from sample_pages import listing_page
+
+SECTION = 'general_discussion'
+
+def test_text_is_normalized_once_per_post(monkeypatch):
+    calls = []
+    def counting_normalize(content, title=None):
+        calls.append(content)
+        return normalize(content, title)
+    monkeypatch.setattr(tokenization, 'normalize', counting_normalize)
+    monkeypatch.setattr(data_extractor, 'normalize', counting_normalize)
+
+    config = type('TestConfig', (ScrapingConfig,), {'KEYWORD_SCORING': 'tfidf', 'ANALYZE_SENTIMENT': True})()
+    extractor = DataExtractor(config)
+    posts = extractor.extract_page_data(listing_page(1), SECTION)
+    extractor.analyze_posts(posts)
+    generate_summary_stats({SECTION: posts})
+
+    assert posts
+    assert len(calls) == len(posts)
+    assert all(post[TEXT_KEY] == normalize(post['content'], post['title']) for post in posts)
+
+def test_normalized_text_is_never_saved():
+    posts = DataExtractor().extract_page_data(listing_page(2), SECTION)
+    assert all(TEXT_KEY in post and TEXT_KEY not in public_record(post) for post in posts)
@@ -0,0 +1,47 @@
+"""
+Shared text normalization and tokenization for post records
+"""
+import re
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Record key holding a post's normalized text; keys starting with '_' are never saved
+TEXT_KEY = '_text'
+
+class PostText(NamedTuple):
+    """Lowercased text and word tokens of a post, computed once"""
+    content: str  # content.lower()
+    title: str  # title.lower()
+    words: Tuple[str, ...]  # \w+ tokens of the lowercased content, interned
+
+    @property
+    def combined(self) -> str:
+        """Content and title, as matched by business opportunity keywords"""
+        return f"{self.content} {self.title}"
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """\\w+ tokens of already-normalized text, interned so repeated words share memory"""
+    return tuple(sys.intern(word) for word in WORD_PATTERN.findall(text))
+
+def normalize(content: Optional[str], title: Optional[str] = None) -> PostText:
+    """Normalize a post's content and title"""
+    content_lower = (content or '').lower()
+    return PostText(content_lower, (title or '').lower(), tokenize(content_lower))
+
+def post_text(record: Dict) -> PostText:
+    """The record's normalized text, computed and stored on first use"""
+    text = record.get(TEXT_KEY)
+    if text is None:
+        text = normalize(record.get('content'), record.get('title'))
+        record[TEXT_KEY] = text
+    return text
+
+def keyword_tokens(words: Tuple[str, ...]) -> List[str]:
+    """Words made of 3+ ASCII letters, the tokens \\b[a-zA-Z]{3,}\\b finds in the same text"""
+    return [word for word in words if len(word) >= 3 and word.isascii() and word.isalpha()]
+
+def public_record(record: Dict) -> Dict:
+    """The record without private (underscore) keys, for saving"""
+    return {key: value for key, value in record.items() if not key.startswith('_')}
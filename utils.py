@@ -4,12 +4,16 @@ Utility functions for the Imamother scraper
 import os
 import logging
 import json
-import csv
 import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from logging.handlers import RotatingFileHandler
 
+from tokenization import post_text, tokenize
+from taxonomy import get_taxonomy
+from sentiment import sentiment_label
+from storage import CsvPostWriter, open_data, read_csv_posts
+
 def setup_logging(log_level: str = "INFO", log_file: str = "scraper.log") -> logging.Logger:
     """Setup logging configuration"""
     logger = logging.getLogger()
@@ -61,50 +65,41 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 def save_json(data: Any, filepath: str, indent: int = 2):
-    """Save data to JSON file"""
+    """Save data to JSON file, compressed when its extension names a codec (.gz, .xz, .zst)"""
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with open_data(filepath, 'w') as f:
             json.dump(data, f, indent=indent, ensure_ascii=False, default=str)
         print(f"Data saved to JSON: {filepath}")
     except Exception as e:
         print(f"Error saving JSON file {filepath}: {e}")
 
 def load_json(filepath: str) -> Optional[Any]:
-    """Load data from JSON file"""
+    """Load data from JSON file, decompressing it by its extension"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with open_data(filepath) as f:
             return json.load(f)
     except Exception as e:
         print(f"Error loading JSON file {filepath}: {e}")
         return None
 
 def save_csv(data: List[Dict], filepath: str):
-    """Save list of dictionaries to CSV file"""
+    """Save post records to CSV file, with the post schema's columns; compressed like save_json"""
     if not data:
         print("No data to save to CSV")
         return
     
     try:
-        # Get all unique keys for headers
-        all_keys = set()
-        for item in data:
-            all_keys.update(item.keys())
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(data)
+        with CsvPostWriter(filepath) as writer:
+            writer.write(data)
         
         print(f"Data saved to CSV: {filepath}")
     except Exception as e:
         print(f"Error saving CSV file {filepath}: {e}")
 
 def load_csv(filepath: str) -> List[Dict]:
-    """Load data from CSV file"""
+    """Load post records from CSV file, decoding list, number and boolean columns; decompressed like load_json"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        return read_csv_posts(filepath)
     except Exception as e:
         print(f"Error loading CSV file {filepath}: {e}")
         return []
@@ -195,64 +190,12 @@ def calculate_engagement_score(post_data: Dict) -> float:
 
 def categorize_business_opportunity(post_data: Dict) -> str:
     """Categorize post by business opportunity type"""
-    content = post_data.get('content', '').lower()
-    title = post_data.get('title', '').lower()
+    text = post_text(post_data)
     section = post_data.get('section', '')
     
-    # Product opportunity keywords
-    product_keywords = [
-        'product', 'buy', 'purchase', 'recommend', 'brand', 'quality',
-        'where to find', 'best', 'review', 'comparison'
-    ]
-    
-    # Service opportunity keywords
-    service_keywords = [
-        'service', 'help', 'professional', 'expert', 'consultation',
-        'advice', 'guidance', 'support', 'therapy', 'counseling'
-    ]
-    
-    # Information opportunity keywords
-    info_keywords = [
-        'information', 'learn', 'understand', 'explain', 'guide',
-        'tutorial', 'how to', 'what is', 'resource', 'book'
-    ]
-    
-    # Community opportunity keywords
-    community_keywords = [
-        'group', 'community', 'support', 'meet', 'connect',
-        'share', 'experience', 'similar', 'together'
-    ]
-    
-    text_to_check = f"{content} {title}"
-    
-    # Count keyword matches
-    product_score = sum(1 for keyword in product_keywords if keyword in text_to_check)
-    service_score = sum(1 for keyword in service_keywords if keyword in text_to_check)
-    info_score = sum(1 for keyword in info_keywords if keyword in text_to_check)
-    community_score = sum(1 for keyword in community_keywords if keyword in text_to_check)
-    
-    # Determine category based on highest score
-    scores = {
-        'product': product_score,
-        'service': service_score,
-        'information': info_score,
-        'community': community_score
-    }
-    
-    max_category = max(scores, key=scores.get)
-    
-    # If no clear winner, use section-based categorization
-    if scores[max_category] == 0:
-        if 'pregnancy' in section or 'childbirth' in section:
-            return 'health_service'
-        elif 'married' in section:
-            return 'relationship_service'
-        elif 'infertility' in section:
-            return 'medical_service'
-        else:
-            return 'general'
-    
-    return max_category
+    # One scan scores every taxonomy category; posts matching no keyword
+    # fall back to section-based categorization
+    return get_taxonomy().categorize(text.combined, section, text.words + tokenize(text.title))
 
 def generate_summary_stats(data: Dict[str, List[Dict]]) -> Dict:
     """Generate summary statistics for scraped data"""
@@ -269,36 +212,46 @@ def generate_summary_stats(data: Dict[str, List[Dict]]) -> Dict:
             'answers': 0,
             'resource_mentions': 0
         },
-        'business_opportunities': {
-            'product': 0,
-            'service': 0,
-            'information': 0,
-            'community': 0
-        },
+        'business_opportunities': {category: 0 for category in get_taxonomy().categories},
         'temporal_analysis': {
             'posts_by_hour': {},
             'posts_by_day': {}
+        },
+        'sentiment': {
+            'scored_posts': 0,
+            'avg_polarity': 0,
+            'avg_intensity': 0,
+            'positive': 0,
+            'negative': 0,
+            'neutral': 0
         }
     }
     
-    all_posts = []
     for section_name, posts in data.items():
         stats['sections'][section_name] = len(posts)
         stats['total_posts'] += len(posts)
-        all_posts.extend(posts)
     
-    if not all_posts:
+    if not stats['total_posts']:
         return stats
     
-    # Calculate engagement stats
-    total_replies = sum(post.get('replies_count', 0) for post in all_posts)
-    total_views = sum(post.get('views_count', 0) for post in all_posts)
+    # One pass over the posts, so sections read back from a file are read once
+    total_replies = 0
+    total_views = 0
+    sentiment = stats['sentiment']
     
-    stats['engagement_stats']['avg_replies'] = total_replies / len(all_posts)
-    stats['engagement_stats']['avg_views'] = total_views / len(all_posts)
-    
-    # Analyze content
-    for post in all_posts:
+    for post in (post for posts in data.values() for post in posts):
+        # Calculate engagement stats
+        total_replies += post.get('replies_count', 0)
+        total_views += post.get('views_count', 0)
+        
+        # Sentiment scores, present when ANALYZE_SENTIMENT was on
+        if post.get('sentiment_polarity') is not None:
+            sentiment['scored_posts'] += 1
+            sentiment['avg_polarity'] += post['sentiment_polarity']
+            sentiment['avg_intensity'] += post.get('sentiment_intensity', 0)
+            sentiment[sentiment_label(post['sentiment_polarity'])] += 1
+        
+        # Analyze content
         if post.get('is_question'):
             stats['content_analysis']['questions'] += 1
         if post.get('is_answer'):
@@ -332,6 +285,12 @@ def generate_summary_stats(data: Dict[str, List[Dict]]) -> Dict:
             except:
                 pass
     
+    stats['engagement_stats']['avg_replies'] = total_replies / stats['total_posts']
+    stats['engagement_stats']['avg_views'] = total_views / stats['total_posts']
+    if sentiment['scored_posts']:
+        sentiment['avg_polarity'] /= sentiment['scored_posts']
+        sentiment['avg_intensity'] /= sentiment['scored_posts']
+    
     return stats
 
 def create_robots_txt_checker(base_url: str) -> callable: